@@ -25,15 +25,22 @@ class RegistrationSerializer(serializers.ModelSerializer):
         """
         Create a new user after checking password match,
         and automatically create a related Profile.
+
+        A `password_hash` passed to save() (computed in the hashing pool)
+        is stored as-is instead of hashing the password here.
         """
         password = validated_data.pop('password')
         repeated_password = validated_data.pop('repeated_password')
+        password_hash = validated_data.pop('password_hash', None)
 
         if password != repeated_password:
             raise serializers.ValidationError({'error': 'Passwords do not match'})
 
         user = User(**validated_data)
-        user.set_password(password)
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save()
 
         Profile.objects.create(user=user)
@@ -41,6 +48,8 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-
-    
-    
\ No newline at end of file
+class RefreshTokenSerializer(serializers.Serializer):
+    """
+    Input for the token refresh and revoke endpoints.
+    """
+    refresh = serializers.CharField()
@@ -1,9 +1,11 @@
 from django.urls import path
-from auth_app.api.views import RegistrationView,CustomLoginView
+from auth_app.api.views import RegistrationView,CustomLoginView,TokenRefreshView,TokenRevokeView
 from rest_framework.authtoken.views import obtain_auth_token
 
 
 urlpatterns = [
     path('registration/', RegistrationView.as_view(), name='registration'),
     path('login/', CustomLoginView.as_view(), name='login'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='token-revoke'),
 ]
\ No newline at end of file
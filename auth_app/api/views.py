@@ -1,76 +1,212 @@
-from .serializers import  RegistrationSerializer
+import json
+
+from .serializers import  RegistrationSerializer, RefreshTokenSerializer
+from auth_app.hashing import HashingOverloaded, check_password_async, make_password_async
+from auth_app.models import User
+from auth_app.tokens import InvalidToken, issue_token_pair, revoke_refresh_token, rotate_refresh_token
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
-from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework import status
 
 
 
-class RegistrationView(APIView):
+def _parse_body(request):
+    """
+    Return the request data from a JSON or form body.
+
+    Raises ValueError with a message for the client if the body is not a
+    JSON object.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ValueError('JSON parse error.')
+        if not isinstance(data, dict):
+            raise ValueError(f'Expected a JSON object, but got {type(data).__name__}.')
+        return data
+    return request.POST
+
+
+def _bad_body_response(exc):
+    return JsonResponse({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _overloaded_response():
+    return JsonResponse(
+        {'detail': 'Too many login or registration requests, please retry.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class RegistrationView(View):
     """
     API endpoint for user registration.
     Allows any user (authenticated or not) to create a new account.
+
+    Async view: the password is hashed in the bounded pool from
+    auth_app.hashing, so hashing never blocks the event loop.
     """
-    permission_classes = [AllowAny]
 
-    def post(self, request):
+    async def post(self, request):
         """
         Handle POST requests to register a new user.
 
         - Validates input using RegistrationSerializer
+        - Hashes the password in the hashing pool (503 when it is saturated)
         - Creates a new user and their profile
-        - Returns an auth token along with user info
+        - Returns signed access/refresh tokens (and the legacy auth token
+          while LEGACY_AUTH_TOKENS is set) along with user info
         """
-        serializer = RegistrationSerializer(data=request.data)
-        if serializer.is_valid():
-            saved_account = serializer.save()
-            token, created = Token.objects.get_or_create(user=saved_account)
-
-            data = {
-                'token': token.key,
-                'username': saved_account.username,
-                'email': saved_account.email,
-                'user_id': saved_account.id
-            }
+        try:
+            data = _parse_body(request)
+        except ValueError as exc:
+            return _bad_body_response(exc)
+
+        serializer = RegistrationSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        password = serializer.validated_data['password']
+        if password != serializer.validated_data['repeated_password']:
+            return JsonResponse({'error': 'Passwords do not match'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            password_hash = await make_password_async(password)
+        except HashingOverloaded:
+            return _overloaded_response()
+
+        saved_account, legacy_token = await sync_to_async(self.create_account)(serializer, password_hash)
+
+        data = {
+            'username': saved_account.username,
+            'email': saved_account.email,
+            'user_id': saved_account.id,
+            **issue_token_pair(saved_account)
+        }
+        if legacy_token:
+            data['token'] = legacy_token.key
+
+        return JsonResponse(data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def create_account(serializer, password_hash):
+        with transaction.atomic():
+            saved_account = serializer.save(password_hash=password_hash)
+            legacy_token = Token.objects.create(user=saved_account) if settings.LEGACY_AUTH_TOKENS else None
+        return saved_account, legacy_token
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CustomLoginView(View):
+    """
+    Custom login endpoint.
+    Returns user info along with signed tokens (and the legacy auth token).
 
-            return Response(data, status=status.HTTP_201_CREATED)
-        else:
-            return Response(serializer.errors, status=400)
+    Async view: the password is checked in the bounded pool from
+    auth_app.hashing. Credentials are checked against the User table
+    directly (the project only uses Django's ModelBackend).
+    """
 
+    async def post(self, request):
+        """
+        Handle POST requests for login.
 
-class CustomLoginView(ObtainAuthToken):
+        - Checks the credentials in the hashing pool (503 when it is saturated)
+        - Returns signed access/refresh tokens and user details if valid;
+          the legacy auth token is only looked up while LEGACY_AUTH_TOKENS is set
+        """
+        try:
+            data = _parse_body(request)
+        except ValueError as exc:
+            return _bad_body_response(exc)
+
+        username, password = data.get('username'), data.get('password')
+        if not username or not password:
+            return JsonResponse(
+                {'non_field_errors': ['Must include "username" and "password".']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(username, str) or not isinstance(password, str):
+            return JsonResponse(
+                {'non_field_errors': ['"username" and "password" must be strings.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = await User.objects.filter(username=username).afirst()
+        try:
+            # Always one hash, so unknown and inactive users take as long as wrong passwords
+            valid, upgraded_hash = await check_password_async(password, user.password if user else None)
+        except HashingOverloaded:
+            return _overloaded_response()
+
+        if upgraded_hash:
+            user.password = upgraded_hash
+            await user.asave(update_fields=['password'])
+
+        if not valid or not user.is_active:
+            return JsonResponse(
+                {'non_field_errors': ['Unable to log in with provided credentials.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = {
+            'username': user.username,
+            'email': user.email,
+            'user_id': user.id,
+            **issue_token_pair(user)
+        }
+        if settings.LEGACY_AUTH_TOKENS:
+            token, created = await Token.objects.aget_or_create(user=user)
+            data['token'] = token.key
+        return JsonResponse(data, status=status.HTTP_200_OK)
+
+
+class TokenRefreshView(APIView):
     """
-    Custom login endpoint using token authentication.
-    Returns user info along with the token.
+    Exchange a refresh token for a new access/refresh token pair.
+    The presented refresh token is revoked (rotation).
     """
     permission_classes = [AllowAny]
+    authentication_classes = []
 
     def post(self, request):
-        """
-        Handle POST requests for login.
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        - Validates credentials using DRF's built-in serializer
-        - Returns a token and user details if valid
-        """
-        serializer = self.serializer_class(data=request.data)
-        data = {}
+        try:
+            data = rotate_refresh_token(serializer.validated_data['refresh'])
+        except InvalidToken as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
+        return Response(data, status=status.HTTP_200_OK)
 
-        if serializer.is_valid():
-         user = serializer.validated_data['user']
-         token, created = Token.objects.get_or_create(user=user)
-         return Response({
-         'token': token.key,
-         'username': user.username,
-         'email': user.email,
-         'user_id': user.id
-    }, status=status.HTTP_200_OK)
-        else:
-         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class TokenRevokeView(APIView):
+    """
+    Revoke a refresh token, e.g. on logout.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
 
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
+        try:
+            revoke_refresh_token(serializer.validated_data['refresh'])
+        except InvalidToken as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
 
-    
-    
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,163 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from auth_app.models import User
+from auth_app.tokens import InvalidToken, decode_access_token
+
+
+CACHED_USER_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'type',
+    'is_staff', 'is_superuser', 'is_active', 'date_joined', 'last_login',
+]
+
+
+class TokenCache:
+    """
+    Two-tier cache of token key -> resolved user fields.
+
+    The first tier is a bounded, thread-safe LRU in the process. Its entries
+    expire after TOKEN_AUTH_CACHE_TTL seconds so that invalidations made by
+    other processes are picked up. The optional second tier is the Django
+    cache named by TOKEN_AUTH_SHARED_CACHE, shared by all API nodes.
+
+    The password hash is never cached; it stays a deferred field on the
+    users built from the cache.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        alias = settings.TOKEN_AUTH_SHARED_CACHE
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def shared_key(key):
+        return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, values = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return values
+                del self._entries[key]
+
+        if self.shared is not None:
+            values = self.shared.get(self.shared_key(key))
+            if values is not None:
+                self._store_local(key, values)
+                return values
+        return None
+
+    def set(self, key, values):
+        self._store_local(key, values)
+        if self.shared is not None:
+            self.shared.set(self.shared_key(key), values, settings.TOKEN_AUTH_CACHE_TTL)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self.shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, key, values):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.TOKEN_AUTH_CACHE_TTL, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_AUTH_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that resolves tokens from TokenCache.
+
+    Only a cache miss runs the Token/User query; hits build the user from
+    the cached fields without touching the database. Entries are dropped by
+    the signal handlers in auth_app.signals when a token is deleted or its
+    user is saved.
+    """
+
+    def authenticate_credentials(self, key):
+        values = token_cache.get(key)
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            values = {
+                'user': {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                'created': token.created,
+            }
+            token_cache.set(key, values)
+            return user, token
+
+        user = _from_values(User, values['user'])
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        token = _from_values(Token, {'key': key, 'user_id': user.id, 'created': values['created']})
+        token.user = user
+        return user, token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticate `Authorization: Bearer <access token>` headers.
+
+    Access tokens are signed and carry the user id, username, type, staff
+    flag and expiry (see auth_app.tokens), so they are verified without any
+    database access. Other fields of request.user are loaded lazily.
+    Requests with a legacy `Token <key>` header are left to
+    CachedTokenAuthentication.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid bearer header.')
+
+        try:
+            claims = decode_access_token(auth[1].decode())
+        except (InvalidToken, UnicodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc))
+
+        user = _from_values(User, {
+            'id': claims['uid'],
+            'username': claims['usr'],
+            'type': claims['typ'],
+            'is_staff': claims['stf'],
+            'is_active': True,
+        })
+        return user, claims
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+def _from_values(model, values):
+    """Build a model instance as if loaded from the database; missing fields stay deferred."""
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(None, field_names, [values[name] for name in field_names])
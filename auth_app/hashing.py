@@ -0,0 +1,99 @@
+"""
+Password hashing offloaded to a bounded process pool.
+
+PBKDF2 keeps a worker busy for tens of milliseconds per call. The async
+registration and login views await these helpers instead, so under ASGI
+(core/asgi.py) the event loop keeps serving other endpoints while the
+hashes are computed in PASSWORD_HASHING_WORKERS separate processes.
+
+At most PASSWORD_HASHING_MAX_PENDING hashes may be queued or running at
+once; further calls fail fast with HashingOverloaded so that sign-up bursts
+turn into 503 responses instead of an ever-growing backlog.
+
+Hash upgrades (after a hasher or iteration count change) are computed in
+the worker but saved by the caller, since a worker process cannot write
+to the caller's user object.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, is_password_usable, make_password
+
+
+class HashingOverloaded(Exception):
+    """Raised when too many password hashes are already pending."""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = None
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None and settings.PASSWORD_HASHING_WORKERS:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'),),
+            )
+        return _pool
+
+
+def _get_pending():
+    global _pending
+    with _pool_lock:
+        if _pending is None:
+            _pending = threading.BoundedSemaphore(settings.PASSWORD_HASHING_MAX_PENDING)
+        return _pending
+
+
+async def _run(func, *args):
+    pending = _get_pending()
+    if not pending.acquire(blocking=False):
+        raise HashingOverloaded('Too many password operations in progress.')
+    try:
+        # Without a pool (PASSWORD_HASHING_WORKERS = 0) the default thread executor is used
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+    finally:
+        pending.release()
+
+
+async def make_password_async(password):
+    """Hash a password in the pool and return the encoded hash."""
+    return await _run(make_password, password)
+
+
+def _check_password(password, encoded):
+    if encoded is None or not is_password_usable(encoded):
+        # Same cost as a wrong password, like Django's ModelBackend for unknown users
+        make_password(password)
+        return False, None
+
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, upgraded[0] if upgraded else None
+
+
+async def check_password_async(password, encoded):
+    """
+    Check a password against an encoded hash in the pool.
+
+    Returns (valid, upgraded hash or None). The upgraded hash is the
+    password encoded with the preferred hasher and should be saved when
+    set. Every call runs one hash, also for a missing (None) or unusable
+    `encoded`, so callers take the same time whether or not the user exists.
+    """
+    return await _run(_check_password, password, encoded)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0006_alter_user_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='type',
+            field=models.CharField(choices=[('customer', 'Customer'), ('business', 'Business')], db_index=True, default='customer', max_length=8),
+        ),
+    ]
@@ -15,6 +15,28 @@ class User(AbstractUser):
     type = models.CharField(
         max_length=8,
         choices=TYPE_CHOICE,
-        default="customer"
+        default="customer",
+        db_index=True
     )
-    """Defines the role of the user: either 'customer' or 'business'."""
\ No newline at end of file
+    """Defines the role of the user: either 'customer' or 'business'."""
+
+class RevokedRefreshToken(models.Model):
+    """
+    Revocation list for signed refresh tokens.
+
+    Refresh tokens are self-verifying, so issuing one needs no database
+    write; a row is only stored once a token is rotated or revoked.
+
+    Fields:
+        jti: Unique id of the revoked refresh token.
+        user: The user the token was issued to.
+        expires_at: Original expiry of the token; rows past it can be purged.
+        revoked_at: Timestamp when the token was revoked.
+    """
+    jti = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, related_name='revoked_refresh_tokens', on_delete=models.CASCADE)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revoked refresh token {self.jti}"
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from auth_app.authentication import token_cache
+from auth_app.models import User
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached credentials so the next request sees the saved user."""
+    if not created:
+        token_cache.delete(*Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -1,3 +1,85 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.test import TestCase, override_settings
+
+from auth_app.models import User
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user('customer', password='pw12345!x', type='customer')
+
+    def login(self, body):
+        return self.client.post('/api/login/', body, content_type='application/json')
+
+    def test_valid_credentials(self):
+        response = self.login({'username': 'customer', 'password': 'pw12345!x'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+    def test_body_must_be_an_object(self):
+        for body in ([1], '"customer"', 1, None):
+            with self.subTest(body=body):
+                response = self.login(body)
+
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_json(self):
+        response = self.login('{"username":')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'JSON parse error.'})
+
+    def test_credentials_must_be_strings(self):
+        for body in (
+            {'username': ['customer'], 'password': 'pw12345!x'},
+            {'username': 'customer', 'password': {'value': 'pw12345!x'}},
+            {'username': 'customer', 'password': 12345},
+        ):
+            with self.subTest(body=body):
+                response = self.login(body)
+
+                self.assertEqual(response.status_code, 400)
+
+
+    def test_outdated_hash_is_upgraded(self):
+        with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher',
+        ]):
+            response = self.login({'username': 'customer', 'password': 'pw12345!x'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(username='customer').password.startswith('pbkdf2_sha256$'))
+
+    def test_every_attempt_hashes_once(self):
+        User.objects.create_user('inactive', password='pw12345!x', type='customer', is_active=False)
+        User.objects.create_user('unusable', password=None, type='customer')
+
+        for username in ('customer', 'inactive', 'unusable', 'unknown'):
+            with self.subTest(username=username), \
+                    mock.patch.object(MD5PasswordHasher, 'encode', autospec=True,
+                                      side_effect=MD5PasswordHasher.encode) as encode:
+                response = self.login({'username': username, 'password': 'wrong-password'})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(encode.call_count, 1)
+
+    def test_inactive_user_cannot_log_in(self):
+        User.objects.create_user('inactive', password='pw12345!x', type='customer', is_active=False)
+
+        response = self.login({'username': 'inactive', 'password': 'pw12345!x'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RegistrationTests(TestCase):
+
+    def test_body_must_be_an_object(self):
+        response = self.client.post('/api/registration/', [1], content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'Expected a JSON object, but got list.'})
@@ -0,0 +1,98 @@
+"""
+Signed, self-verifying access and refresh tokens.
+
+Both token kinds are signed with Django's signing framework (HMAC with
+SECRET_KEY) and carry the user id, type and expiry, so access tokens are
+verified without any database access. Refresh tokens additionally carry a
+unique id (jti) that is checked against RevokedRefreshToken when they are
+used; rotating a refresh token revokes the old one.
+"""
+import secrets
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+
+from auth_app.models import RevokedRefreshToken, User
+
+
+ACCESS_SALT = 'auth_app.tokens.access'
+REFRESH_SALT = 'auth_app.tokens.refresh'
+
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, tampered with, expired or revoked."""
+
+
+def issue_token_pair(user):
+    """
+    Return a dict with a new access and refresh token for the user.
+    """
+    now = int(time.time())
+    claims = {'uid': user.id, 'usr': user.username, 'typ': user.type, 'stf': user.is_staff}
+
+    access = signing.dumps(
+        {**claims, 'exp': now + settings.ACCESS_TOKEN_LIFETIME},
+        salt=ACCESS_SALT, compress=True,
+    )
+    refresh = signing.dumps(
+        {'uid': user.id, 'jti': secrets.token_urlsafe(16), 'exp': now + settings.REFRESH_TOKEN_LIFETIME},
+        salt=REFRESH_SALT, compress=True,
+    )
+    return {
+        'access': access,
+        'refresh': refresh,
+        'access_expires_in': settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def decode_access_token(token):
+    """Verify an access token and return its claims. No database access."""
+    return _decode(token, ACCESS_SALT)
+
+
+def rotate_refresh_token(token):
+    """
+    Revoke a refresh token and return a new token pair for its user.
+
+    Presenting an already revoked refresh token raises InvalidToken.
+    """
+    claims = _decode(token, REFRESH_SALT)
+    try:
+        user = User.objects.get(pk=claims['uid'], is_active=True)
+    except User.DoesNotExist:
+        raise InvalidToken('User inactive or deleted.')
+
+    _revoke(claims)
+    return issue_token_pair(user)
+
+
+def revoke_refresh_token(token):
+    """Revoke a refresh token, e.g. on logout."""
+    claims = _decode(token, REFRESH_SALT)
+    _revoke(claims)
+
+
+def _decode(token, salt):
+    try:
+        claims = signing.loads(token, salt=salt)
+    except signing.BadSignature:
+        raise InvalidToken('Invalid token.')
+    if claims.get('exp', 0) < time.time():
+        raise InvalidToken('Token has expired.')
+    return claims
+
+
+def _revoke(claims):
+    # The unique jti makes concurrent use of the same refresh token fail
+    try:
+        with transaction.atomic():
+            RevokedRefreshToken.objects.create(
+                jti=claims['jti'],
+                user_id=claims['uid'],
+                expires_at=datetime.fromtimestamp(claims['exp'], tz=dt_timezone.utc),
+            )
+    except IntegrityError:
+        raise InvalidToken('Token has been revoked.')
@@ -0,0 +1,138 @@
+"""
+Benchmarks for the performance work on the API.
+
+Run them from the project root as modules, e.g.
+
+    python -m benchmarks.login_storm --help
+
+Scripts that need Django call `setup_django()` first; they use the
+database configured by the DB_* environment variables (see
+core/database.py), so point DB_NAME at a scratch file instead of your
+db.sqlite3.
+"""
+import os
+import random
+from itertools import accumulate
+import statistics
+
+WORDS = (
+    'logo design website landing page shop app mobile react django api backend '
+    'frontend seo copywriting translation video editing animation illustration '
+    'branding flyer poster banner icon ui ux prototype wordpress database cloud '
+    'deployment testing security audit data analysis dashboard chatbot podcast '
+    'voice over photo retouching presentation resume newsletter marketing'
+).split()
+
+
+def vocabulary(size=20000, spacing=50):
+    """
+    Return `size` words ordered from most to least frequent.
+
+    The WORDS sit at every `spacing`-th rank between made-up words, so with
+    Zipf weights they range from very common (logo) to rare (marketing).
+    """
+    rng = random.Random(42)
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'vo', 'zi', 'be', 'do', 'fa', 'gu', 'pe', 'sa', 'ti', 'xo']
+    filler, seen = [], set(WORDS)
+    while len(filler) < size - len(WORDS):
+        word = ''.join(rng.choices(syllables, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            filler.append(word)
+
+    words = []
+    for word in WORDS:
+        words.append(word)
+        words.extend(filler[:spacing - 1])
+        del filler[:spacing - 1]
+    return words + filler
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+
+def percentile(values, percent):
+    """Return the given percentile (0-100) of the values, nearest-rank method."""
+    ordered = sorted(values)
+    if not ordered:
+        return float('nan')
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_latencies(label, seconds):
+    """One report line with count, median and p99 in milliseconds."""
+    if not seconds:
+        return f'{label}: no samples'
+    return (
+        f'{label}: n={len(seconds)} '
+        f'p50={statistics.median(seconds) * 1000:.1f}ms '
+        f'p99={percentile(seconds, 99) * 1000:.1f}ms '
+        f'max={max(seconds) * 1000:.1f}ms'
+    )
+
+
+def get_or_create_user(username, type):
+    """Return a user of the given type with a profile, creating both if needed."""
+    from auth_app.models import User
+    from coder.models import Profile
+
+    user, created = User.objects.get_or_create(username=username, defaults={'type': type})
+    if created:
+        user.set_unusable_password()
+        user.save()
+    Profile.objects.get_or_create(user=user)
+    return user
+
+
+def seed_offers(count, details=True, batch_size=5000, seed=0):
+    """
+    Bulk-create `count` synthetic offers for a benchmark business user.
+
+    Titles and descriptions are drawn from vocabulary() with Zipf weights,
+    like the word frequencies of real text. With `details`
+    every offer gets basic/standard/premium details and its min values.
+    Offers are added to the search index but send no signals.
+    """
+    from django.db import transaction
+
+    from coder.models import Offer, OfferDetail, PlatformStats, Profile
+    from coder.search import get_search_backend
+
+    profile = Profile.objects.get(user=get_or_create_user('bench-business', 'business'))
+    rng = random.Random(seed)
+    words = vocabulary()
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    search_backend = get_search_backend()
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        offers = []
+        for _ in range(size):
+            price = rng.randint(10, 1000)
+            offers.append(Offer(
+                profile=profile,
+                title=' '.join(rng.choices(words, cum_weights=cum_weights, k=4)),
+                description=' '.join(rng.choices(words, cum_weights=cum_weights, k=30)),
+                min_price=price if details else None,
+                min_delivery_time=2 if details else None,
+            ))
+        with transaction.atomic():
+            Offer.objects.bulk_create(offers)
+            if details:
+                OfferDetail.objects.bulk_create([
+                    OfferDetail(
+                        offer=offer, title=f'{offer.title} {offer_type}', revisions=index + 1,
+                        delivery_time_in_days=(index + 1) * 2, price=offer.min_price * (index + 1),
+                        features=['Source files'], offer_type=offer_type,
+                    )
+                    for offer in offers
+                    for index, offer_type in enumerate(('basic', 'standard', 'premium'))
+                ])
+            PlatformStats.increment(offer_count=size)
+            search_backend.index(offers)
+        created += size
+    return profile
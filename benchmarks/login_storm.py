@@ -0,0 +1,121 @@
+"""
+Latency of GET /api/offers/ while the login endpoint is flooded.
+
+Runs against a live server, preferably the ASGI application so the async
+login view can hand the hashing to the pool:
+
+    uvicorn core.asgi:application --port 8000      # or any ASGI server
+    python -m benchmarks.login_storm --url http://127.0.0.1:8000
+
+A throwaway customer account is registered first. The script then measures
+/api/offers/ alone for --duration seconds, and again while --logins threads
+log in back to back. It prints p50/p99 for both phases, and the login
+throughput with the number of 503 (hashing pool saturated) answers.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from benchmarks import format_latencies
+
+
+def request(url, body=None):
+    """Send a GET (or a JSON POST with body) and return (status, seconds)."""
+    data = None if body is None else json.dumps(body).encode()
+    req = Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except HTTPError as exc:
+        status = exc.code
+    return status, time.perf_counter() - started
+
+
+def register(base_url):
+    username = f'storm-{uuid.uuid4().hex[:12]}'
+    password = uuid.uuid4().hex
+    status, _ = request(f'{base_url}/api/registration/', {
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': password,
+        'repeated_password': password,
+        'type': 'customer',
+    })
+    if status != 201:
+        raise SystemExit(f'Registration failed with status {status}')
+    return {'username': username, 'password': password}
+
+
+def measure_offers(base_url, readers, duration):
+    latencies = []
+    deadline = time.monotonic() + duration
+
+    def read():
+        while time.monotonic() < deadline:
+            # A unique parameter skips the response cache
+            status, seconds = request(f'{base_url}/api/offers/?nocache={uuid.uuid4().hex}')
+            if status == 200:
+                latencies.append(seconds)
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def storm(base_url, credentials, logins, stop):
+    results = {'ok': 0, 'overloaded': 0, 'other': 0}
+    lock = threading.Lock()
+
+    def login():
+        while not stop.is_set():
+            status, _ = request(f'{base_url}/api/login/', credentials)
+            key = 'ok' if status == 200 else 'overloaded' if status == 503 else 'other'
+            with lock:
+                results[key] += 1
+
+    threads = [threading.Thread(target=login) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='server base URL')
+    parser.add_argument('--logins', type=int, default=32, help='concurrent login clients')
+    parser.add_argument('--readers', type=int, default=4, help='concurrent /api/offers/ clients')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per phase')
+    args = parser.parse_args()
+    base_url = args.url.rstrip('/')
+
+    credentials = register(base_url)
+    baseline = measure_offers(base_url, args.readers, args.duration)
+
+    stop = threading.Event()
+    started = time.monotonic()
+    threads, results = storm(base_url, credentials, args.logins, stop)
+    during = measure_offers(base_url, args.readers, args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    print(format_latencies('/api/offers/ alone      ', baseline))
+    print(format_latencies('/api/offers/ login storm', during))
+    print(
+        f'/api/login/: {results["ok"] / elapsed:.1f} logins/s, '
+        f'{results["overloaded"]} x 503, {results["other"]} other errors'
+    )
+
+
+if __name__ == '__main__':
+    main()
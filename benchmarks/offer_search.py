@@ -0,0 +1,65 @@
+"""
+Offer search on a synthetic catalogue: LIKE scans vs the full-text backend.
+
+    DB_NAME=/tmp/search.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/search.sqlite3 python -m benchmarks.offer_search --offers 1000000
+
+Seeds random-word offers (see benchmarks.seed_offers) up to --offers, then runs
+every query through the LIKE fallback (what DRF's SearchFilter did) and the
+backend picked for the database (FTS5 on SQLite, tsvector/GIN on
+PostgreSQL). Each search fetches the first page of 20 offers ordered by
+relevance, as /api/offers/?search= does, plus the count. Reports the
+median time per query over --repeat runs.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import seed_offers, setup_django
+
+QUERIES = ('logo', 'design', 'desi', 'react dashboard', 'podcast', 'wordpress security audit')
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--offers', type=int, default=1000000, help='catalogue size')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from coder.models import Offer
+    from coder.search import LikeSearchBackend, get_search_backend
+
+    missing = args.offers - Offer.objects.count()
+    if missing > 0:
+        print(f'Seeding {missing} offers...')
+        started = time.perf_counter()
+        seed_offers(missing, details=False, batch_size=10000)
+        print(f'Seeded in {time.perf_counter() - started:.0f} s')
+
+    backends = {'like': LikeSearchBackend(), 'fulltext': get_search_backend()}
+    print(f'{Offer.objects.count()} offers, full-text backend {type(backends["fulltext"]).__name__}')
+
+    for query in QUERIES:
+        line = [f'{query!r:>26}:']
+        for name, backend in backends.items():
+            def search():
+                queryset = backend.search(Offer.objects.all(), query).order_by('-search_rank', 'id')
+                return queryset.count(), list(queryset.values_list('id', flat=True)[:20])
+
+            seconds, (count, page) = timed(search, args.repeat)
+            line.append(f'{name} {seconds * 1000:8.1f} ms ({count} hits)')
+        print('  '.join(line))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Concurrent order writes and offer reads on SQLite, default vs tuned backend.
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/bench.sqlite3 python -m benchmarks.sqlite_concurrency --writers 8 --readers 4
+
+Runs --writers processes placing orders through OrderView and --readers
+processes listing /api/offers/ (response cache off) for --duration seconds,
+once with django.db.backends.sqlite3 and once with DB_SQLITE_TUNED=1
+(core.backends.sqlite3). Prints throughput, p50/p99 latency and failed
+requests ("database is locked") for both.
+
+The database file is switched back to rollback journaling before the
+default run, since WAL mode sticks to the file once the tuned backend set it.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from benchmarks import format_latencies, get_or_create_user, seed_offers, setup_django
+
+MODES = {'default': '0', 'tuned': '1'}
+
+
+def work(role, index, duration):
+    setup_django()
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from coder.api.views import OfferView, OrderView
+    from coder.models import OfferDetail
+
+    factory = APIRequestFactory()
+    customer = get_or_create_user(f'bench-customer-{index}', 'customer')
+    detail_ids = list(OfferDetail.objects.values_list('id', flat=True)[:100])
+    latencies, errors = [], 0
+
+    with override_settings(OFFER_LIST_CACHE=None, ALLOWED_HOSTS=['testserver']):
+        deadline = time.monotonic() + duration
+        count = 0
+        while time.monotonic() < deadline:
+            if role == 'writer':
+                request = factory.post(
+                    '/api/orders/', {'offer_detail_id': detail_ids[count % len(detail_ids)]}, format='json'
+                )
+                force_authenticate(request, customer)
+                view, expected = OrderView.as_view(), 201
+            else:
+                request = factory.get('/api/offers/', {'page_size': 20})
+                view, expected = OfferView.as_view(), 200
+
+            started = time.perf_counter()
+            try:
+                response = view(request)
+                response.render()
+                ok = response.status_code == expected
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            count += 1
+
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run(mode, args):
+    env = {**os.environ, 'DB_SQLITE_TUNED': MODES[mode]}
+    workers = [
+        subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.sqlite_concurrency',
+             '--worker', role, '--index', str(index), '--duration', str(args.duration)],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+        for role, count in (('writer', args.writers), ('reader', args.readers))
+        for index in range(count)
+    ]
+    results = {'writer': {'latencies': [], 'errors': 0}, 'reader': {'latencies': [], 'errors': 0}}
+    for process, role in zip(workers, ['writer'] * args.writers + ['reader'] * args.readers):
+        output, _ = process.communicate()
+        result = json.loads(output.strip().splitlines()[-1])
+        results[role]['latencies'] += result['latencies']
+        results[role]['errors'] += result['errors']
+
+    for role, label in (('writer', 'order create'), ('reader', 'offer list  ')):
+        latencies = results[role]['latencies']
+        print(
+            f'{mode:>7} {format_latencies(label, latencies)} '
+            f'{len(latencies) / args.duration:.0f}/s, {results[role]["errors"]} failed'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=15, help='seconds per mode')
+    parser.add_argument('--worker', choices=('writer', 'reader'), help=argparse.SUPPRESS)
+    parser.add_argument('--index', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(work(args.worker, args.index, args.duration)))
+        return
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    from coder.models import Offer
+
+    if connection.vendor != 'sqlite':
+        raise SystemExit('This benchmark needs an SQLite database (DB_ENGINE=sqlite).')
+    if not Offer.objects.exists():
+        seed_offers(1000)
+    for index in range(args.writers):
+        get_or_create_user(f'bench-customer-{index}', 'customer')
+    connection.close()
+
+    for mode in MODES:
+        if mode == 'default':
+            with sqlite3.connect(settings.DATABASES['default']['NAME']) as db:
+                db.execute('PRAGMA journal_mode = DELETE')
+        run(mode, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Peak memory and time to first byte of a large offer list, paginated vs streamed.
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/bench.sqlite3 python -m benchmarks.streaming_memory --rows 10000
+
+Seeds the offers if the database has fewer than --rows. Each mode then runs
+in a fresh process, so its peak RSS is not inflated by the other:
+
+    page    GET /api/offers/?page_size=<rows> (one page with every offer)
+    stream  GET /api/offers/?stream=1
+
+Both run as a customer, since streaming needs an authenticated user. Peak
+RSS is reported as the growth over the process after one warm-up request.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks import get_or_create_user, seed_offers, setup_django
+
+MODES = ('page', 'stream')
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, rows):
+    setup_django()
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from coder.api.pagination import LargeResultsSetPagination
+    from coder.api.views import OfferView
+
+    # Let the paginated mode return every offer in one page like the stream
+    LargeResultsSetPagination.max_page_size = max(LargeResultsSetPagination.max_page_size, rows)
+
+    factory = APIRequestFactory()
+    view = OfferView.as_view()
+    customer = get_or_create_user('bench-customer', 'customer')
+    params = {'stream': 1} if mode == 'stream' else {'page_size': rows}
+
+    def get(params):
+        request = factory.get('/api/offers/', params)
+        force_authenticate(request, customer)
+        return view(request)
+
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        get({'page_size': 1}).render()
+        baseline = peak_rss_mib()
+
+        started = time.perf_counter()
+        response = get(params)
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            size = len(next(chunks))
+            first_byte = time.perf_counter() - started
+            size += sum(len(chunk) for chunk in chunks)
+        else:
+            size = len(response.render().content)
+            first_byte = time.perf_counter() - started
+        total = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'bytes': size,
+        'first_byte_ms': first_byte * 1000,
+        'total_ms': total * 1000,
+        'peak_rss_growth_mib': peak_rss_mib() - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='number of offers to list')
+    parser.add_argument('--measure', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.rows)))
+        return
+
+    setup_django()
+    from coder.models import Offer
+
+    missing = args.rows - Offer.objects.count()
+    if missing > 0:
+        print(f'Seeding {missing} offers...')
+        seed_offers(missing)
+
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.streaming_memory', '--measure', mode, '--rows', str(args.rows)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f'{mode:>6}: peak RSS +{result["peak_rss_growth_mib"]:.1f} MiB, '
+            f'first byte {result["first_byte_ms"]:.0f} ms, total {result["total_ms"]:.0f} ms, '
+            f'{result["bytes"] / 1024 / 1024:.1f} MiB'
+        )
+
+
+if __name__ == '__main__':
+    main()
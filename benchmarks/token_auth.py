@@ -0,0 +1,87 @@
+"""
+Queries and latency per request of hot endpoints by authentication class.
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/bench.sqlite3 python -m benchmarks.token_auth
+
+Calls GET /api/offers/ and GET /api/profile/<pk>/ --requests times as the
+same user for each of:
+
+    drf     rest_framework TokenAuthentication (Token/User join every request)
+    cached  auth_app CachedTokenAuthentication (warm TokenCache)
+    signed  auth_app SignedTokenAuthentication (Bearer access token)
+
+Prints the queries per request and the mean latency. The difference
+between drf and the others is the authentication query.
+"""
+import argparse
+import time
+
+from benchmarks import get_or_create_user, seed_offers, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint and class')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIRequestFactory
+
+    from auth_app.authentication import CachedTokenAuthentication, SignedTokenAuthentication
+    from auth_app.tokens import issue_token_pair
+    from coder.api.views import OfferView
+    from coder.models import Offer, Profile
+    from profile_app.api.views import ProfileDetailView
+
+    if not Offer.objects.exists():
+        seed_offers(100)
+    user = get_or_create_user('bench-customer', 'customer')
+    profile = Profile.objects.get(user=user)
+    token, created = Token.objects.get_or_create(user=user)
+    headers = {
+        'drf': f'Token {token.key}',
+        'cached': f'Token {token.key}',
+        'signed': f'Bearer {issue_token_pair(user)["access"]}',
+    }
+    classes = {
+        'drf': TokenAuthentication,
+        'cached': CachedTokenAuthentication,
+        'signed': SignedTokenAuthentication,
+    }
+    endpoints = [
+        ('/api/offers/', OfferView, {}),
+        (f'/api/profile/{profile.pk}/', ProfileDetailView, {'pk': profile.pk}),
+    ]
+    factory = APIRequestFactory()
+
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        for path, view_class, kwargs in endpoints:
+            for name, authentication_class in classes.items():
+                view = view_class.as_view(authentication_classes=[authentication_class])
+
+                def get():
+                    response = view(factory.get(path, HTTP_AUTHORIZATION=headers[name]), **kwargs)
+                    response.render()
+                    assert response.status_code == 200, response.status_code
+
+                get()  # warm up, fills the token cache
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(args.requests):
+                        get()
+                    elapsed = time.perf_counter() - started
+
+                print(
+                    f'{path:<22} {name:>6}: {len(queries) / args.requests:.1f} queries/request, '
+                    f'{elapsed / args.requests * 1000:.2f} ms/request'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Response cache for anonymous list reads with tag-based invalidation.
+
+Entries live in the Django cache named by the OFFER_LIST_CACHE setting (a
+LocMemCache by default, which evicts least recently used entries beyond
+MAX_ENTRIES and expires them after OFFER_LIST_CACHE_TTL seconds). Every
+entry records the current version of each of its tags; invalidating a tag
+replaces its version, so all entries carrying the tag stop matching. With
+a shared cache backend (e.g. Redis) invalidations reach all processes.
+
+Hits and misses are counted in core.metrics and shown at /api/metrics/.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from core.metrics import RESPONSE_CACHE_LOOKUPS
+
+
+class ResponseCache:
+    """
+    Cache of response data keyed by request, invalidated by tags.
+    """
+    prefix = 'response-cache'
+
+    @property
+    def cache(self):
+        alias = settings.OFFER_LIST_CACHE
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        """Return the cached data, or None if missing or any of its tags was invalidated."""
+        entry = self.cache.get(self._entry_key(key))
+        if entry is not None:
+            versions, data = entry
+            current = self.cache.get_many([self._tag_key(tag) for tag in versions])
+            if all(current.get(self._tag_key(tag)) == version for tag, version in versions.items()):
+                RESPONSE_CACHE_LOOKUPS.inc('hit')
+                return data
+        RESPONSE_CACHE_LOOKUPS.inc('miss')
+        return None
+
+    def set(self, key, data, tags):
+        tag_keys = {tag: self._tag_key(tag) for tag in tags}
+        current = self.cache.get_many(tag_keys.values())
+        missing = {tag_key: uuid.uuid4().hex for tag_key in tag_keys.values() if tag_key not in current}
+        if missing:
+            self.cache.set_many(missing, timeout=None)
+            current.update(missing)
+
+        versions = {tag: current[tag_key] for tag, tag_key in tag_keys.items()}
+        self.cache.set(self._entry_key(key), (versions, data), settings.OFFER_LIST_CACHE_TTL)
+
+    def invalidate(self, *tags):
+        """
+        Evict every entry carrying one of the tags.
+
+        Runs once the current transaction commits; invalidating earlier would
+        let requests that still see the old rows cache them again under the
+        new version.
+        """
+        if self.cache is not None and tags:
+            transaction.on_commit(lambda: self._replace_versions(tags))
+
+    def _replace_versions(self, tags):
+        # A new random version (not a counter) so a culled tag key can never revalidate old entries
+        self.cache.set_many({self._tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+    def _entry_key(self, key):
+        return f'{self.prefix}:entry:{key}'
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+
+response_cache = ResponseCache()
+
+
+class CachedListMixin:
+    """
+    Serve anonymous list GETs from `response_cache`.
+
+    The key is the absolute URL (scheme, host and path) plus the sorted
+    query parameters, so filters, search, ordering, page and page_size all
+    select their own entry, and the absolute `next`/`previous` links of one
+    host are never served to another.
+    Streaming requests are never cached. Views define get_cache_tags(data)
+    to tag an entry with what it contains. Responses carry `X-Cache: HIT`
+    or `X-Cache: MISS`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(getattr(response, 'data', None), dict):
+            response_cache.set(key, response.data, self.get_cache_tags(response.data))
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def is_cacheable(self, request):
+        return (
+            response_cache.cache is not None
+            and not request.user.is_authenticated
+            and getattr(self, 'stream_query_param', None) not in request.query_params
+        )
+
+    def get_cache_key(self, request):
+        params = sorted((name, sorted(request.query_params.getlist(name))) for name in request.query_params)
+        raw = f'{request.build_absolute_uri(request.path)}?{params}'
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_cache_tags(self, data):
+        return []
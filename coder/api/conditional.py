@@ -0,0 +1,110 @@
+import hashlib
+
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+
+
+class _PreconditionResponse(Exception):
+    """Carries a 304 / 412 response out of initial()."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalRequestMixin:
+    """
+    ETag / Last-Modified support for detail views.
+
+    After authentication and permission checks, the object's version is read
+    with one indexed `values_list(*version_fields)` lookup, before the object
+    itself is loaded or serialized. `version_fields` may also hold
+    expressions, e.g. a subquery over related rows. The ETag is a hash of
+    that version and Last-Modified is its first field.
+
+    - GET/HEAD: a matching If-None-Match (or If-Modified-Since) returns 304.
+    - PATCH/PUT/DELETE: a stale If-Match (or If-Unmodified-Since) returns 412.
+      These requests run in a transaction and lock the row while the version
+      is checked, so two clients cannot both update from the same ETag.
+
+    Responses carry the current ETag and Last-Modified. If
+    `conditional_owner_lookup` is set, preconditions are only evaluated for
+    requests allowed by `conditional_allowed()`; all others take the normal
+    path and get its 403.
+    """
+    version_fields = ('updated_at',)
+    conditional_owner_lookup = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_version = self.get_version(for_update=request.method not in SAFE_METHODS)
+        if self.conditional_version is not None:
+            response = get_conditional_response(
+                request,
+                etag=self.get_etag(self.conditional_version),
+                last_modified=self.get_last_modified(self.conditional_version),
+            )
+            if response is not None:
+                raise _PreconditionResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _PreconditionResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (200 <= response.status_code < 300 or response.status_code == 304) and request.method != 'DELETE':
+            version = getattr(self, 'conditional_version', None)
+            if request.method not in SAFE_METHODS and response.status_code != 304:
+                version = self.get_version()
+            if version is not None:
+                response['ETag'] = self.get_etag(version)
+                response['Last-Modified'] = http_date(self.get_last_modified(version))
+        return response
+
+    def get_version(self, for_update=False):
+        """
+        Return the version tuple of the requested object, or None if it does not
+        exist or the request may not use preconditions on it.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().prefetch_related(None) \
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if for_update:
+            queryset = queryset.select_for_update(of=('self',))
+
+        fields = list(self.version_fields)
+        if self.conditional_owner_lookup:
+            fields.append(self.conditional_owner_lookup)
+
+        row = queryset.values_list(*fields).first()
+        if row is None:
+            return None
+        if self.conditional_owner_lookup:
+            row, owner_id = row[:-1], row[-1]
+            if not self.conditional_allowed(self.request, owner_id):
+                return None
+        return row
+
+    def conditional_allowed(self, request, owner_id):
+        """By default anyone may read, only the owner may write."""
+        return request.method in SAFE_METHODS or owner_id == request.user.id
+
+    def get_etag_variant(self):
+        """Extra input for the ETag when the representation depends on the request."""
+        return ''
+
+    def get_etag(self, version):
+        raw = repr((type(self).__name__, self.get_etag_variant(), version))
+        return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+    def get_last_modified(self, version):
+        return int(version[0].timestamp())
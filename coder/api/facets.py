@@ -0,0 +1,97 @@
+"""
+Facet counts for the offer list filter sidebar.
+
+All facets are computed in one query: a UNION ALL of one GROUP BY per
+facet over the already filtered offer queryset. Price and delivery time
+are bucketed on the denormalized, indexed min_price / min_delivery_time
+columns, so no offer details are joined for them.
+"""
+from django.db.models import Case, CharField, Count, Value, When
+from django.db.models.functions import Cast
+
+from coder.models import OfferDetail
+
+
+PRICE_BUCKETS = (50, 100, 250, 500, 1000)
+DELIVERY_TIME_BUCKETS = (1, 3, 7, 14, 30)
+CREATOR_LIMIT = 20
+
+
+def offer_facets(queryset, price_buckets=PRICE_BUCKETS, delivery_time_buckets=DELIVERY_TIME_BUCKETS,
+                 creator_limit=CREATOR_LIMIT):
+    """
+    Return facet counts for the offers in `queryset`.
+
+    {
+        "price": [{"min": 0, "max": 50, "count": 3}, ..., {"min": 1000, "max": null, "count": 1}],
+        "delivery_time": [{"min": 0, "max": 1, "count": 0}, ...],
+        "offer_type": {"basic": 12, "standard": 10, "premium": 4},
+        "creator": [{"creator_id": 7, "count": 9}, ...]
+    }
+
+    Bucket bounds are min inclusive, max exclusive. Offers without details
+    are not counted in the price and delivery time facets; `creator` lists
+    the `creator_limit` creators with the most offers.
+    """
+    offers = queryset.order_by()
+    branches = [
+        _bucket_branch(offers, 'price', 'min_price', price_buckets),
+        _bucket_branch(offers, 'delivery_time', 'min_delivery_time', delivery_time_buckets),
+        _group_branch(
+            OfferDetail.objects.filter(offer__in=offers.values('pk')), 'offer_type', 'offer_type',
+            Count('offer', distinct=True),
+        ),
+        _group_branch(offers, 'creator', 'profile__user_id', Count('pk')),
+    ]
+    counts = {'price': {}, 'delivery_time': {}, 'offer_type': {}, 'creator': {}}
+    for facet, key, count in branches[0].union(*branches[1:], all=True):
+        if key is not None:
+            counts[facet][key] = count
+
+    creators = sorted(counts['creator'].items(), key=lambda item: (-item[1], int(item[0])))
+    return {
+        'price': _buckets(price_buckets, counts['price']),
+        'delivery_time': _buckets(delivery_time_buckets, counts['delivery_time']),
+        'offer_type': {
+            offer_type: counts['offer_type'].get(offer_type, 0)
+            for offer_type, label in OfferDetail.OFFER_TYPE_CHOICES
+        },
+        'creator': [
+            {'creator_id': int(creator_id), 'count': count}
+            for creator_id, count in creators[:creator_limit]
+        ],
+    }
+
+
+def _group_branch(queryset, facet, field, count):
+    return queryset \
+        .annotate(facet=Value(facet, output_field=CharField()), key=Cast(field, CharField())) \
+        .values('facet', 'key') \
+        .annotate(count=count) \
+        .values_list('facet', 'key', 'count') \
+        .order_by()
+
+
+def _bucket_branch(queryset, facet, field, bounds):
+    # Bucket i holds values in [bounds[i - 1], bounds[i]); NULLs get no bucket
+    bucket = Case(
+        When(**{f'{field}__isnull': True}, then=Value(None)),
+        *[When(**{f'{field}__lt': bound}, then=Value(str(index))) for index, bound in enumerate(bounds)],
+        default=Value(str(len(bounds))),
+        output_field=CharField(),
+    )
+    return queryset \
+        .annotate(facet=Value(facet, output_field=CharField()), key=bucket) \
+        .values('facet', 'key') \
+        .annotate(count=Count('pk')) \
+        .values_list('facet', 'key', 'count') \
+        .order_by()
+
+
+def _buckets(bounds, counts):
+    lower_bounds = (0, *bounds)
+    upper_bounds = (*bounds, None)
+    return [
+        {'min': low, 'max': high, 'count': counts.get(str(index), 0)}
+        for index, (low, high) in enumerate(zip(lower_bounds, upper_bounds))
+    ]
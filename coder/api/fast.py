@@ -0,0 +1,182 @@
+from django.core.exceptions import ImproperlyConfigured
+from core.metrics import serialize_timer
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class FastReader:
+    """
+    Row-to-dict function for a serializer class, compiled once per class.
+
+    Each readable serializer field is mapped to a `.values()` lookup and a
+    converter (the DRF field's own `to_representation`), so list endpoints
+    can render plain database rows with the same output as the serializer
+    without building model instances or running DRF's per-field machinery.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.lookups = []
+        self.getters = []
+
+        model = serializer_class.Meta.model
+        fast_sources = getattr(serializer_class, 'fast_sources', {})
+        fast_deferred = getattr(serializer_class, 'fast_deferred', ())
+
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+
+            if name in fast_deferred:
+                getter = _constant(None)
+            elif isinstance(fast_sources.get(name), dict):
+                getter = self._nested_getter(fast_sources[name])
+            elif name in fast_sources:
+                getter = self._raw_getter(fast_sources[name])
+            elif isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) \
+                    or field.source == '*':
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} needs an entry in "
+                    "fast_sources or fast_deferred to be read on the fast path."
+                )
+            elif hasattr(field, 'fast_representation'):
+                getter = self._request_getter('__'.join(field.source_attrs), field.fast_representation)
+            elif isinstance(field, serializers.FileField):
+                storage = model._meta.get_field(field.source).storage
+                use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+                getter = self._file_getter(field.source, storage, use_url)
+            elif isinstance(field, serializers.RelatedField):
+                # values() already returns the primary key of the related row
+                getter = self._raw_getter('__'.join(field.source_attrs))
+            else:
+                getter = self._field_getter('__'.join(field.source_attrs), field.to_representation)
+
+            self.getters.append((name, getter))
+
+    def _add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+
+    def _raw_getter(self, lookup):
+        self._add_lookup(lookup)
+        return lambda row, request: row[lookup]
+
+    def _nested_getter(self, sources):
+        for lookup in sources.values():
+            self._add_lookup(lookup)
+        items = list(sources.items())
+        return lambda row, request: {key: row[lookup] for key, lookup in items}
+
+    def _field_getter(self, lookup, to_representation):
+        self._add_lookup(lookup)
+
+        def getter(row, request):
+            value = row[lookup]
+            return None if value is None else to_representation(value)
+        return getter
+
+    def _request_getter(self, lookup, fast_representation):
+        self._add_lookup(lookup)
+        return lambda row, request: fast_representation(row[lookup], request)
+
+    def _file_getter(self, lookup, storage, use_url):
+        self._add_lookup(lookup)
+
+        def getter(row, request):
+            name = row[lookup]
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return getter
+
+    def render(self, rows, context):
+        """
+        Convert `.values()` rows into the serializer's output dicts.
+        """
+        request = context.get('request')
+        getters = self.getters
+        rows = list(rows)
+        with serialize_timer():
+            data = [{name: getter(row, request) for name, getter in getters} for row in rows]
+        return self.serializer_class.fast_finalize(data, rows, context)
+
+
+class FastReadSerializerMixin:
+    """
+    Opt-in read-only fast path for ModelSerializers used by list endpoints.
+
+    Attributes:
+        fast_sources: Output field -> `.values()` lookup for fields that can
+            not be derived automatically (e.g. SerializerMethodFields). A
+            dict value builds a nested object from several lookups.
+        fast_deferred: Output fields left as None by the reader and filled
+            in bulk by `fast_finalize` (e.g. nested lists).
+    """
+    fast_sources = {}
+    fast_deferred = ()
+
+    @classmethod
+    def get_fast_reader(cls):
+        # Cached per class so that subclasses compile their own reader
+        if '_fast_reader' not in cls.__dict__:
+            cls._fast_reader = FastReader(cls)
+        return cls._fast_reader
+
+    @classmethod
+    def fast_finalize(cls, data, rows, context):
+        """
+        Post-process the rendered rows in bulk. Returns the list of dicts.
+        """
+        return data
+
+
+class FastListMixin:
+    """
+    Serves GET list requests through the serializer's FastReader.
+
+    The filtered queryset is turned into a `.values()` query (plus any
+    columns and annotations needed for ordering and keyset cursors),
+    paginated as usual and rendered without model instances. Views whose
+    serializer does not use FastReadSerializerMixin fall back to the
+    regular list().
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, FastReadSerializerMixin):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        reader = serializer_class.get_fast_reader()
+        lookups = list(reader.lookups)
+        # Annotations (e.g. a search rank) may be ordered by, too
+        for lookup in [*self.get_fast_ordering_lookups(), *queryset.query.annotation_select]:
+            if lookup not in lookups:
+                lookups.append(lookup)
+
+        queryset = queryset.prefetch_related(None).values(*lookups)
+
+        page = self.paginate_queryset(queryset)
+        data = reader.render(page if page is not None else queryset, self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_fast_ordering_lookups(self):
+        """
+        Return the columns the paginator may need to order by and build cursors from.
+        """
+        ordering = list(getattr(self, 'ordering', None) or [])
+        ordering_fields = getattr(self, 'ordering_fields', None)
+        if isinstance(ordering_fields, (list, tuple)):
+            ordering += ordering_fields
+        return ['id'] + [field.lstrip('-') for field in ordering]
+
+
+def _constant(value):
+    return lambda row, request: value
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+
+class RenditionsField(serializers.Field):
+    """
+    Read-only `{label: url}` of the image renditions recorded in a JSON
+    model field (see coder.images). Empty until the renditions exist.
+
+    `image_field` names the model's image field, whose storage serves the files.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        kwargs['read_only'] = True
+        self.image_field = image_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.fast_representation(value, self.context.get('request'))
+
+    def fast_representation(self, value, request):
+        """Representation for the FastReader, which has no serializer context."""
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        urls = {}
+        for label, name in (value or {}).items():
+            if label == 'source':
+                continue
+            url = storage.url(name)
+            urls[label] = request.build_absolute_uri(url) if request is not None else url
+        return urls
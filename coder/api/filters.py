@@ -0,0 +1,37 @@
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from coder.search import get_search_backend
+
+
+class OfferSearchFilter(BaseFilterBackend):
+    """
+    Full-text search on offer title and description via `?search=<terms>`.
+
+    Uses the configured backend from coder.search instead of DRF's
+    SearchFilter, whose LIKE '%term%' scans cannot use an index. Results
+    are ordered by relevance unless the request sets `?ordering=`, also in
+    keyset mode (see get_ordering). Keep it after OrderingFilter in
+    `filter_backends`.
+    """
+    search_param = 'search'
+    relevance_ordering = ('-search_rank', 'id')
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_query(request)
+        if not query:
+            return queryset
+
+        queryset = get_search_backend(queryset.db).search(queryset, query)
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_ordering(self, request, queryset, view):
+        """Return the relevance ordering for searches without `?ordering=`, else None."""
+        if self.get_query(request) and OrderingFilter.ordering_param not in request.query_params:
+            return list(self.relevance_ordering)
+        return None
+
+    def get_query(self, request):
+        return request.query_params.get(self.search_param, '').strip()
@@ -0,0 +1,137 @@
+"""
+Bulk import of offers from JSON Lines or CSV.
+
+Used by the `offers/import/` endpoint and the `import_offers` management
+command. Rows are read lazily, validated with OfferSerializer and written
+in chunks: every chunk is one transaction with one bulk INSERT for the
+offers and one for their details, so memory stays bounded by the chunk
+size no matter how large the input is.
+
+Each row describes one offer in the same shape as a POST to `/api/offers/`:
+
+    {"title": "...", "description": "...", "details": [{"title": "...", ...}]}
+
+In CSV files `details` is a column holding that list as JSON.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+
+from coder.models import Offer, OfferDetail, PlatformStats
+from coder.search import get_search_backend
+from .cache import response_cache
+from .serializers import OfferSerializer
+
+
+IMPORT_FORMATS = ('jsonl', 'csv')
+DEFAULT_BATCH_SIZE = 500
+
+
+def read_jsonl(lines):
+    """
+    Yield (line number, row) for every non-empty line.
+    Lines that are not a JSON object yield None as the row.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def read_csv(lines):
+    """
+    Yield (line number, row) for every CSV record after the header.
+    A `details` column that is not valid JSON yields None as the row.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        try:
+            row['details'] = json.loads(row.get('details') or '[]')
+        except ValueError:
+            row = None
+        yield reader.line_num, row
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def guess_format(filename):
+    """Return the import format for a file name, defaulting to JSON Lines."""
+    return 'csv' if filename.lower().endswith('.csv') else 'jsonl'
+
+
+class OfferImportResult:
+    """
+    Outcome of an import: number of created offers and the rejected rows.
+
+    At most `max_errors` errors are kept; `error_count` counts all of them.
+    """
+
+    def __init__(self, max_errors=None):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+
+def import_offers(rows, profile, batch_size=DEFAULT_BATCH_SIZE, result=None):
+    """
+    Create offers for `profile` from (line number, row) pairs.
+
+    Invalid rows are reported in the result and skipped; valid rows are
+    inserted `batch_size` at a time. Returns an OfferImportResult.
+    """
+    result = result or OfferImportResult()
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return result
+
+        valid = []
+        for line, row in chunk:
+            if row is None:
+                result.add_error(line, {'non_field_errors': ['Could not parse row.']})
+                continue
+            serializer = OfferSerializer(data=row)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                result.add_error(line, serializer.errors)
+
+        if valid:
+            result.created += _create_chunk(valid, profile)
+
+
+def _create_chunk(validated_rows, profile):
+    offers = []
+    for data in validated_rows:
+        data = dict(data)
+        details_data = data.pop('details')
+        offers.append(Offer(profile=profile, **OfferSerializer.min_values(details_data), **data))
+
+    with transaction.atomic():
+        # bulk_create sets the primary keys on SQLite and PostgreSQL
+        Offer.objects.bulk_create(offers)
+        OfferDetail.objects.bulk_create([
+            OfferDetail(offer=offer, **detail_data)
+            for offer, data in zip(offers, validated_rows)
+            for detail_data in data['details']
+        ])
+        # bulk_create sends no post_save signals
+        PlatformStats.increment(offer_count=len(offers))
+        get_search_backend().index(offers)
+        response_cache.invalidate('offers')
+    return len(offers)
@@ -0,0 +1,270 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks by the full ordering key instead of an offset.
+
+    The ordering is taken from the view (the last filter backend with a
+    get_ordering() that returns one, e.g. OrderingFilter, or its `ordering`
+    attribute) and always ends with `id` as a unique tie-breaker, e.g.
+    ('created_at', 'id'). The cursor stores the key of the first/last row of
+    the current page, so every page is a single index range scan no matter
+    how deep the client pages. Ordering fields must be model fields or
+    annotations and should be backed by a composite (field, id) index. NULLs of nullable
+    fields sort after every value (last ascending, first descending) on
+    every database.
+
+    Query parameters:
+        cursor: Opaque position returned in `next` / `previous`.
+        page_size: Number of results per page (at most max_page_size).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, self.reverse = self.decode_cursor(request)
+        nullable = _nullable_fields(queryset.model, self.ordering)
+
+        ordering = _reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*_order_by(ordering, nullable))
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position, nullable))
+
+        # Fetch one extra row to find out whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering as a tuple ending with the `id` tie-breaker.
+        """
+        ordering = None
+        backends = [backend for backend in getattr(view, 'filter_backends', []) if hasattr(backend, 'get_ordering')]
+        # Later backends order after earlier ones; one returning None leaves the ordering to the others
+        for backend in reversed(backends):
+            ordering = backend().get_ordering(request, queryset, view)
+            if ordering:
+                break
+        if not backends:
+            ordering = getattr(view, 'ordering', None)
+
+        if not ordering:
+            ordering = self.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        ordering = list(ordering)
+
+        assert not any('__' in field for field in ordering), (
+            'Keyset pagination does not support double underscore lookups for orderings.'
+        )
+
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+
+    def decode_cursor(self, request):
+        """
+        Return (position, reverse) for the cursor in the request.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        position = [_cursor_value(_get_value(instance, field.lstrip('-'))) for field in self.ordering]
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    @staticmethod
+    def _keyset_filter(ordering, position, nullable=()):
+        """
+        Build the row-value comparison `(f1, f2, ...) > (v1, v2, ...)` for the
+        given ordering, respecting the direction of each field. NULL counts
+        as greater than every value, matching _order_by().
+        """
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            after = _after(name, field.startswith('-'), position[index], name in nullable)
+            if after is not None:
+                equal = [_equal(ordering[i].lstrip('-'), position[i]) for i in range(index)]
+                conditions.append(Q(*equal) & after)
+        if not conditions:
+            return Q(pk__in=[])
+
+        # Redundant bound on the leading column lets the planner use a range scan
+        first = ordering[0].lstrip('-')
+        if position[0] is None:
+            bound = Q() if ordering[0].startswith('-') else Q(**{f'{first}__isnull': True})
+        elif ordering[0].startswith('-'):
+            bound = Q(**{f'{first}__lte': position[0]})
+        else:
+            bound = Q(**{f'{first}__gte': position[0]})
+            if first in nullable:
+                bound |= Q(**{f'{first}__isnull': True})
+        return bound & reduce(or_, conditions)
+
+
+class LargeResultsSetPagination(PageNumberPagination):
+    """
+    Pagination class to control page size and maximum page size.
+
+    Passing a `cursor` query parameter (empty for the first page) switches
+    to keyset mode, where deep pages cost the same as the first one and the
+    response contains `next` / `previous` cursors instead of a count.
+    """
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 10000
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+def _nullable_fields(model, ordering):
+    nullable = set()
+    for field in ordering:
+        name = field.lstrip('-')
+        try:
+            if model._meta.get_field(name).null:
+                nullable.add(name)
+        except FieldDoesNotExist:
+            # pk and annotations
+            pass
+    return nullable
+
+
+def _order_by(ordering, nullable):
+    # Pin where NULLs go; SQLite and PostgreSQL disagree by default
+    expressions = []
+    for field in ordering:
+        name = field.lstrip('-')
+        if name not in nullable:
+            expressions.append(field)
+        elif field.startswith('-'):
+            expressions.append(F(name).desc(nulls_first=True))
+        else:
+            expressions.append(F(name).asc(nulls_last=True))
+    return expressions
+
+
+def _equal(name, value):
+    if value is None:
+        return Q(**{f'{name}__isnull': True})
+    return Q(**{name: value})
+
+
+def _after(name, descending, value, nullable):
+    """Condition for rows whose `name` sorts after `value`, or None if no row can."""
+    if value is None:
+        return Q(**{f'{name}__isnull': False}) if descending else None
+    after = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+    if nullable and not descending:
+        after |= Q(**{f'{name}__isnull': True})
+    return after
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+def _get_value(instance, name):
+    # Rows may be model instances or dicts from a .values() queryset
+    if isinstance(instance, dict):
+        return instance[name]
+    return getattr(instance, name)
+
+
+def _cursor_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    # str() keeps full microsecond precision for datetimes
+    return str(value)
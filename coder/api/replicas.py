@@ -0,0 +1,43 @@
+import random
+
+from rest_framework.permissions import SAFE_METHODS
+
+from core.database import current_read_alias, is_pinned_to_primary, replica_aliases
+
+
+class ReplicaReadMixin:
+    """
+    Run the queries of GET/HEAD requests on a read replica.
+
+    Requests from users who wrote within the last REPLICA_PIN_SECONDS
+    (see core.middleware.ReplicaPinningMiddleware) stay on the primary.
+    Without replicas this does nothing. The alias is chosen after authentication, so the token
+    lookup itself always reads from the primary. Streamed response bodies
+    are produced after the view returns and read from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            alias = self.get_read_alias(request)
+            if alias is not None:
+                self._read_alias_token = current_read_alias.set(alias)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Also after uncaught exceptions, which skip finalize_response();
+            # the next request on this thread would otherwise read from the replica
+            token = getattr(self, '_read_alias_token', None)
+            if token is not None:
+                current_read_alias.reset(token)
+                self._read_alias_token = None
+
+    def get_read_alias(self, request):
+        aliases = replica_aliases()
+        if not aliases:
+            return None
+        if request.user.is_authenticated and is_pinned_to_primary(request.user.id):
+            return None
+        return random.choice(aliases)
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from coder.models import Profile,OfferDetail, Offer,Order,Review
-from django.db.models import Min
+from django.db import IntegrityError, transaction
+from django.db.models import Subquery
+from django.utils import timezone
+from .fast import FastReadSerializerMixin
+from .fields import RenditionsField
 
 
 class OfferDetailHyperlinkedSerializer(serializers.HyperlinkedModelSerializer):
@@ -53,12 +57,24 @@ class OfferSerializer(serializers.ModelSerializer):
         model = Offer
         fields = ['id', 'title', 'image', 'description', 'details']
 
+    @staticmethod
+    def min_values(details_data):
+        """Return the denormalized min_price / min_delivery_time for validated details."""
+        return {
+            'min_price': min((d['price'] for d in details_data), default=None),
+            'min_delivery_time': min((d['delivery_time_in_days'] for d in details_data), default=None),
+        }
+
     def create(self, validated_data):
         request = self.context.get('request')
         profile = Profile.objects.get(user=request.user)
         details_data = validated_data.pop('details')
 
-        offer = Offer.objects.create(profile=profile, **validated_data)
+        offer = Offer.objects.create(
+            profile=profile,
+            **self.min_values(details_data),
+            **validated_data
+        )
 
         for detail_data in details_data:
             OfferDetail.objects.create(offer=offer, **detail_data)
@@ -72,7 +88,12 @@ class OfferSerializer(serializers.ModelSerializer):
     - If `details` are provided:
         * Validates presence of `offer_type`.
         * Ensures each `offer_type` exists for the Offer.
-        * Updates the matching detail with new values.
+        * Updates the changed columns of all matching details in one bulk_update.
+        * Recomputes the denormalized min_price / min_delivery_time.
+    - Saves the Offer only if one of its own fields changed.
+
+    Everything runs in one transaction, so a PATCH costs at most two
+    writes no matter how many details it touches.
 
     Returns:
         Offer: the updated instance.
@@ -80,34 +101,57 @@ class OfferSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         details_data = validated_data.pop('details', None)
-
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if details_data is not None:
-            
-            existing_details = {d.offer_type: d for d in instance.details.all()}
-
-            for detail_data in details_data:
-                offer_type = detail_data.get('offer_type')
-                if not offer_type:
-                    raise serializers.ValidationError({
-                        "details": "Each detail must include a valid 'offer_type'."
-                    })
-
-                if offer_type not in existing_details:
-                    raise serializers.ValidationError({
-                        "details": f"OfferDetail with offer_type '{offer_type}' does not exist for this offer."
-                    })
-
-             
-                detail = existing_details[offer_type]
-                for attr, value in detail_data.items():
-                    setattr(detail, attr, value)
-                detail.save()
+        changed_fields = self._apply_changes(instance, validated_data)
+
+        with transaction.atomic():
+            if details_data is not None:
+                existing_details = {d.offer_type: d for d in instance.details.all()}
+                changed_details, changed_detail_fields = [], set()
+
+                for detail_data in details_data:
+                    offer_type = detail_data.get('offer_type')
+                    if not offer_type:
+                        raise serializers.ValidationError({
+                            "details": "Each detail must include a valid 'offer_type'."
+                        })
+
+                    if offer_type not in existing_details:
+                        raise serializers.ValidationError({
+                            "details": f"OfferDetail with offer_type '{offer_type}' does not exist for this offer."
+                        })
+
+                    detail = existing_details[offer_type]
+                    detail_fields = self._apply_changes(detail, detail_data)
+                    if detail_fields:
+                        changed_details.append(detail)
+                        changed_detail_fields.update(detail_fields)
+
+                if changed_details:
+                    # bulk_update does not apply auto_now
+                    now = timezone.now()
+                    for detail in changed_details:
+                        detail.updated_at = now
+                    changed_detail_fields.add('updated_at')
+                    OfferDetail.objects.bulk_update(changed_details, sorted(changed_detail_fields))
+
+                details = existing_details.values()
+                changed_fields += self._apply_changes(instance, {
+                    'min_price': min((d.price for d in details), default=None),
+                    'min_delivery_time': min((d.delivery_time_in_days for d in details), default=None),
+                })
+
+            if changed_fields:
+                instance.save(update_fields=changed_fields + ['updated_at'])
 
         return instance
+
+    @staticmethod
+    def _apply_changes(obj, values):
+        """Set the values that differ from the object's and return their field names."""
+        changed = [attr for attr, value in values.items() if getattr(obj, attr) != value]
+        for attr in changed:
+            setattr(obj, attr, values[attr])
+        return changed
     
 
 class OfferDetailListSerializer(serializers.ModelSerializer):
@@ -125,20 +169,33 @@ class OfferDetailListSerializer(serializers.ModelSerializer):
     
 
 
-class OfferListSerializer(serializers.ModelSerializer):
+class OfferListSerializer(FastReadSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for listing offers with summary details and min values.
     """
+    fast_sources = {
+        'user': 'profile__user_id',
+        'user_details': {
+            'first_name': 'profile__user__first_name',
+            'last_name': 'profile__user__last_name',
+            'username': 'profile__user__username',
+        },
+        'min_price': 'min_price',
+        'min_delivery_time': 'min_delivery_time',
+    }
+    fast_deferred = ('details',)
+
     user = serializers.SerializerMethodField()
     user_details = serializers.SerializerMethodField()
     min_price = serializers.SerializerMethodField()
     min_delivery_time = serializers.SerializerMethodField()
     details = OfferDetailListSerializer(many=True)
+    image_renditions = RenditionsField(image_field='image')
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description',
+            'id', 'user', 'title', 'image', 'image_renditions', 'description',
             'created_at', 'updated_at', 'details',
             'min_price', 'min_delivery_time', 'user_details'
         ]
@@ -154,10 +211,22 @@ class OfferListSerializer(serializers.ModelSerializer):
         }
 
     def get_min_price(self, obj):
-        return obj.details.all().aggregate(Min('price'))['price__min']
+        return obj.min_price
 
     def get_min_delivery_time(self, obj):
-        return obj.details.all().aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min']
+        return obj.min_delivery_time
+
+    @classmethod
+    def fast_finalize(cls, data, rows, context):
+        """Attach the detail links of all offers with a single query."""
+        details = {item['id']: [] for item in data}
+        for offer_id, detail_id in OfferDetail.objects.filter(offer_id__in=details) \
+                .order_by('id').values_list('offer_id', 'id'):
+            details[offer_id].append({'id': detail_id, 'url': f"/offerdetails/{detail_id}/"})
+
+        for item in data:
+            item['details'] = details[item['id']]
+        return data
 
 
 
@@ -169,11 +238,12 @@ class OfferDetailViewSerializer(serializers.ModelSerializer):
     details = OfferDetailHyperlinkedSerializer(many=True, read_only=True)
     min_price = serializers.SerializerMethodField()
     min_delivery_time = serializers.SerializerMethodField()
+    image_renditions = RenditionsField(image_field='image')
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description',
+            'id', 'user', 'title', 'image', 'image_renditions', 'description',
             'created_at', 'updated_at', 'details',
             'min_price', 'min_delivery_time',
         ]
@@ -191,27 +261,23 @@ class OfferDetailViewSerializer(serializers.ModelSerializer):
         ]
 
     def get_min_price(self, obj):
-        return obj.details.all().aggregate(Min('price'))['price__min']
+        return obj.min_price
 
     def get_min_delivery_time(self, obj):
-        return obj.details.all().aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min']
+        return obj.min_delivery_time
 
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(FastReadSerializerMixin, serializers.ModelSerializer):
     """
     Read-only serializer for retrieving orders with full offer detail info.
+
+    The offer detail fields come from the snapshot stored on the order, so
+    reading orders needs no join.
     """
     customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
     business_user = serializers.PrimaryKeyRelatedField(read_only=True)
 
-    title = serializers.CharField(source='offer_detail.title', read_only=True)
-    revisions = serializers.IntegerField(source='offer_detail.revisions', read_only=True)
-    delivery_time_in_days = serializers.IntegerField(source='offer_detail.delivery_time_in_days', read_only=True)
-    price = serializers.DecimalField(source='offer_detail.price', max_digits=10, decimal_places=2, read_only=True)
-    features = serializers.JSONField(source='offer_detail.features', read_only=True)
-    offer_type = serializers.CharField(source='offer_detail.offer_type', read_only=True)
-
     class Meta:
         model = Order
         fields = [
@@ -222,6 +288,21 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+class OrderableOfferDetailField(serializers.PrimaryKeyRelatedField):
+    """
+    Offer detail lookup for placing an order.
+
+    One query loads the detail joined with its offer (for the business
+    profile id) and annotated with `customer_profile_id`, the profile of the
+    requesting user.
+    """
+
+    def get_queryset(self):
+        user_id = self.context['request'].user.id
+        customer_profile = Profile.objects.filter(user_id=user_id).values('pk')[:1]
+        return OfferDetail.objects.select_related('offer').annotate(customer_profile_id=Subquery(customer_profile))
+
+
 class OrderCreateserializer(serializers.ModelSerializer):
     """
     Serializer for creating a new Order.
@@ -232,30 +313,34 @@ class OrderCreateserializer(serializers.ModelSerializer):
     Methods:
         create: Creates a new Order using the logged-in customer's profile, the business profile
                 from the OfferDetail, and sets status to 'in_progress' by default.
+                Pass `idempotency_key` to save() to record the client's key.
     """
-    offer_detail_id = serializers.PrimaryKeyRelatedField(source='offer_detail', queryset=OfferDetail.objects.all())
+    offer_detail_id = OrderableOfferDetailField(source='offer_detail')
   
     class Meta:
         model = Order
         fields = ['offer_detail_id']
         read_only_fields = ['status', 'created_at', 'updated_at']
 
-    def create(self, validated_data):
-        request = self.context.get('request')
-        customer_profile = Profile.objects.get(user=request.user)
+    def validate(self, attrs):
+        if attrs['offer_detail'].customer_profile_id is None:
+            raise serializers.ValidationError({
+                'non_field_errors': ["Only users with a profile can place orders."]
+            })
+        return attrs
 
+    def create(self, validated_data):
         offer_detail = validated_data['offer_detail']
-        business_profile = offer_detail.offer.profile
 
-        # Set status to 'in_progress' by default
-        order = Order.objects.create(
+        # Set status to 'in_progress' by default; everything else is already loaded
+        return Order.objects.create(
             offer_detail=offer_detail,
-            customer_user=customer_profile,
-            business_user=business_profile,
-            status='in_progress'
+            customer_user_id=offer_detail.customer_profile_id,
+            business_user_id=offer_detail.offer.profile_id,
+            status='in_progress',
+            idempotency_key=validated_data.get('idempotency_key'),
+            **Order.snapshot(offer_detail),
         )
-
-        return order
     
 
 class OrderUpdateSerializer(serializers.ModelSerializer):
@@ -270,7 +355,7 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
         fields = ['status']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(FastReadSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for viewing and updating Reviews.
 
@@ -301,7 +386,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         instance.rating = validated_data.get('rating', instance.rating)
         instance.description = validated_data.get('description', instance.description)
-        instance.save()
+        # The rating aggregates of the business profile change in the same transaction
+        with transaction.atomic():
+            instance.save()
         return instance
 
 
@@ -315,8 +402,9 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
         description: Review description.
 
     Methods:
-        validate: Checks if the user has already reviewed this business.
         create: Creates a new Review with the current user as the reviewer.
+                A second review for the same business is rejected by the
+                unique constraint on (reviewer, business_user).
     """
     business_user = serializers.PrimaryKeyRelatedField(queryset=Profile.objects.filter(user__type='business'))
 
@@ -324,25 +412,19 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
         model = Review
         fields = ['business_user', 'rating', 'description']
 
-    def validate(self, data):
-        request = self.context.get('request')
-        reviewer_profile = Profile.objects.get(user=request.user)
-
-        if Review.objects.filter(
-            reviewer=reviewer_profile,
-            business_user=data['business_user']
-        ).exists():
-            raise serializers.ValidationError("You have already reviewed this business.")
-
-        return data
-
     def create(self, validated_data):
         request = self.context.get('request')
         reviewer_profile = Profile.objects.get(user=request.user)
 
-        return Review.objects.create(
-            business_user=validated_data['business_user'],
-            reviewer=reviewer_profile,
-            rating=validated_data['rating'],
-            description=validated_data.get('description', '')
-        )
\ No newline at end of file
+        try:
+            with transaction.atomic():
+                return Review.objects.create(
+                    business_user=validated_data['business_user'],
+                    reviewer=reviewer_profile,
+                    rating=validated_data['rating'],
+                    description=validated_data.get('description', '')
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({
+                'non_field_errors': ["You have already reviewed this business."]
+            })
\ No newline at end of file
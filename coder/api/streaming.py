@@ -0,0 +1,57 @@
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import UserRateThrottle
+
+
+class StreamRateThrottle(UserRateThrottle):
+    """Limits streamed lists per user to the `stream` rate in DEFAULT_THROTTLE_RATES."""
+    scope = 'stream'
+
+
+class StreamingListMixin:
+    """
+    Adds an opt-in streaming mode to list views.
+
+    With `?stream=1` the filtered and ordered queryset is read from the
+    database in chunks of `stream_chunk_size` rows, each row is serialized
+    on its own and the JSON array is written out as a StreamingHttpResponse.
+    Memory stays flat regardless of the number of rows and the first bytes
+    are sent before the last row is read. Pagination is skipped in this mode.
+
+    A stream can cover a whole table, so it is only available to
+    authenticated users and throttled by `stream_throttle_classes`.
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    stream_throttle_classes = [StreamRateThrottle]
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+
+        if not request.user.is_authenticated:
+            raise NotAuthenticated('Streaming is only available to authenticated users.')
+        for throttle in (throttle_class() for throttle_class in self.stream_throttle_classes):
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered and getattr(self, 'ordering', None):
+            queryset = queryset.order_by(*self.ordering)
+
+        return StreamingHttpResponse(self.stream_rows(queryset), content_type='application/json')
+
+    def stream_rows(self, queryset):
+        """
+        Yield the JSON array for the queryset one serialized row at a time.
+        """
+        serializer = self.get_serializer()
+        renderer = JSONRenderer()
+
+        yield b'['
+        separator = b''
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            yield separator + renderer.render(serializer.to_representation(instance))
+            separator = b','
+        yield b']'
@@ -1,16 +1,18 @@
 from django.urls import path
-from .views import  OfferView,OfferDetailView,OfferDetailRetrieveView,OrderView,OrderDetailView,BusinessUserOrderCountView,BusinessUserOrderCompletedCountView,ReviewCreateView,ReviewDetailView,BaseInfoView
+from .views import  OfferView,OfferImportView,OfferDetailView,OfferDetailRetrieveView,OrderView,OrderDetailView,BusinessUserOrderCountView,BusinessUserOrderCompletedCountView,BusinessUserOrderCountsView,ReviewCreateView,ReviewDetailView,BaseInfoView
 
 
 urlpatterns = [
    
     path('offers/', OfferView.as_view(), name='offer_list'),
+    path('offers/import/', OfferImportView.as_view(), name='offer_import'),
     path('offers/<int:pk>/', OfferDetailView.as_view(), name='offer_detail'),
     path('offerdetails/<int:pk>/', OfferDetailRetrieveView.as_view(), name='offerdetail_detail'),
     path('orders/', OrderView.as_view(), name='order_list'),
     path('orders/<int:pk>/', OrderDetailView.as_view(), name='order_detail'),
     path('order-count/<int:business_user_id>/', BusinessUserOrderCountView.as_view(), name='order-count'),
     path('completed-order-count/<int:business_user_id>/', BusinessUserOrderCompletedCountView.as_view(), name='order-completed-count'),
+    path('order-counts/', BusinessUserOrderCountsView.as_view(), name='order-counts'),
     path('reviews/', ReviewCreateView.as_view(), name='review-create'),
     path('reviews/<int:pk>/', ReviewDetailView.as_view(), name='review-detail'),
     path('base-info/', BaseInfoView.as_view(), name='base-info'),
@@ -1,28 +1,34 @@
+import codecs
+
 from rest_framework import generics,viewsets,filters,status
 from .serializers import OfferSerializer,OfferListSerializer,OfferDetailViewSerializer,OfferDetailSerializer,OrderSerializer,OrderCreateserializer,OrderUpdateSerializer,ReviewCreateSerializer,ReviewSerializer
-from coder.models import Profile,Offer,OfferDetail,Order,Review
-from coder.models import User
+from coder.models import Profile,Offer,OfferDetail,Order,Review,PlatformStats
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Min, Avg
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.http import Http404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from .pagination import LargeResultsSetPagination
+from .replicas import ReplicaReadMixin
+from .cache import CachedListMixin
+from .conditional import ConditionalRequestMixin
+from .facets import offer_facets
+from .fast import FastListMixin
+from .filters import OfferSearchFilter
+from .importing import IMPORT_FORMATS, READERS, OfferImportResult, guess_format, import_offers
+from .streaming import StreamingListMixin
 from.permissions import IsBusinessUserOrReadOnly, IsOwnerOrReadOnly, IsCustomerForPost, IsReviewOwnerOrReadOnly, IsBusinessForPatchOrAdminForDelete
 
 
-class LargeResultsSetPagination(PageNumberPagination):
-    """
-    Pagination class to control page size and maximum page size.
-    """
-    page_size = 6
-    page_size_query_param = 'page_size'
-    max_page_size = 10000
-
-
-class OfferView(generics.ListCreateAPIView):
+class OfferView(ReplicaReadMixin, CachedListMixin, StreamingListMixin, FastListMixin, generics.ListCreateAPIView):
     """
     List all offers or create a new offer.
 
@@ -31,17 +37,35 @@ class OfferView(generics.ListCreateAPIView):
 
     Filtering:
         Supports filtering by creator_id, min_price, max_delivery_time.
-        Supports search by title and description.
+        Supports full-text search by title and description (`search`),
+        ordered by relevance unless `ordering` is given.
         Supports ordering by updated_at and min_price.
 
     Pagination:
-        Uses LargeResultsSetPagination.
+        Uses LargeResultsSetPagination; `?stream=1` streams all matching
+        offers instead, for authenticated users (see StreamingListMixin).
+
+    Facets:
+        `?facets=1` adds a `facets` object with counts per price bucket,
+        delivery time bucket, offer type and creator for the filtered
+        offers, computed in one extra query (see coder.api.facets).
+
+    Caching:
+        Anonymous GETs are served from the response cache (see
+        coder.api.cache). Pages are tagged with their offers and creators,
+        pages with facets also with `offer-facets`, and evicted by the
+        signals in coder.signals.
+
+    Replicas:
+        GETs read from a replica when configured (see
+        coder.api.replicas), except cache misses: a page cached from a
+        lagging replica would be served stale until its tags are
+        invalidated again.
     """
     queryset = Offer.objects.all()
     permission_classes = [IsBusinessUserOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, OfferSearchFilter]
     filterset_fields = ['profile__user_id']
-    search_fields = ['title', 'description']
     ordering_fields = ['updated_at', 'min_price']
     ordering = ['updated_at']
     pagination_class = LargeResultsSetPagination
@@ -51,38 +75,113 @@ class OfferView(generics.ListCreateAPIView):
             return OfferSerializer  # Serializer for creating an offer
         return OfferListSerializer  # Serializer for listing offers
 
+    def get_paginated_response(self, data):
+        # Added to the page itself, so cached pages keep their facets
+        response = super().get_paginated_response(data)
+        if self.request.query_params.get('facets') in ('1', 'true'):
+            response.data['facets'] = offer_facets(self.filter_queryset(self.get_queryset()))
+        return response
+
+    def get_read_alias(self, request):
+        if self.is_cacheable(request):
+            return None
+        return super().get_read_alias(request)
+
+    def get_cache_tags(self, data):
+        results = data.get('results', [])
+        tags = {'offers'}
+        tags.update(f'offer:{offer["id"]}' for offer in results)
+        tags.update(f'creator:{offer["user"]}' for offer in results)
+        if 'facets' in data:
+            tags.add('offer-facets')
+        return sorted(tags)
+
     def get_queryset(self):
-     queryset = super().get_queryset()
+        """
+        Build the offer list queryset in a fixed number of queries.
+
+        Profile and user are joined in and the details are prefetched, so
+        the serializer never has to query per offer. The min_price and
+        min_delivery_time filters run against the denormalized, indexed
+        columns on Offer.
+        """
+        queryset = super().get_queryset() \
+            .select_related('profile__user') \
+            .prefetch_related('details')
+
+        # Filter by creator_id
+        creator_id = self.request.query_params.get('creator_id')
+        if creator_id:
+            queryset = queryset.filter(profile__user__id=creator_id)
+
+        # Filter by min_price
+        min_price = self.request.query_params.get('min_price')
+        if min_price:
+            try:
+                min_price = float(min_price)
+            except ValueError:
+                raise ValidationError({"min_price": "Must be a number."})
+            queryset = queryset.filter(min_price__gte=min_price)
+
+        # Filter by max_delivery_time
+        max_delivery_time = self.request.query_params.get('max_delivery_time')
+        if max_delivery_time:
+            try:
+                max_delivery_time = int(max_delivery_time)
+            except ValueError:
+                raise ValidationError({"max_delivery_time": "Must be an integer."})
+            queryset = queryset.filter(min_delivery_time__lte=max_delivery_time)
 
-    # Filter by creator_id
-     creator_id = self.request.query_params.get('creator_id')
-     if creator_id:
-        queryset = queryset.filter(profile__user__id=creator_id)
+        return queryset
 
-    # Filter by min_price
-     min_price = self.request.query_params.get('min_price')
-     if min_price:
-        try:
-            min_price = float(min_price)
-        except ValueError:
-            raise ValidationError({"min_price": "Must be a number."})
-        queryset = queryset.annotate(min_price=Min('details__price')) \
-                           .filter(min_price__gte=min_price)
 
-    # Filter by max_delivery_time
-     max_delivery_time = self.request.query_params.get('max_delivery_time')
-     if max_delivery_time:
+class OfferImportView(APIView):
+    """
+    Bulk-create offers for the calling business user from an uploaded file.
+
+    Expects a multipart upload in `file`, either JSON Lines or CSV (see
+    coder.api.importing). The format is taken from `format` or from the
+    file extension. The file is read line by line and written in chunks,
+    so large files do not have to fit in memory.
+
+    Response:
+        {"created": 120, "error_count": 2, "errors": [{"line": 7, "errors": {...}}]}
+        At most `max_errors` row errors are listed.
+    """
+    permission_classes = [IsAuthenticated, IsBusinessUserOrReadOnly]
+    parser_classes = [MultiPartParser]
+    max_errors = 100
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'This field is required.'})
+        if not upload.size:
+            raise ValidationError({'file': 'The submitted file is empty.'})
+
+        import_format = request.data.get('format') or guess_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({'format': f'Must be one of: {", ".join(IMPORT_FORMATS)}.'})
+
+        profile = get_object_or_404(Profile, user_id=request.user.id)
+        lines = codecs.iterdecode(upload, 'utf-8')
         try:
-            max_delivery_time = int(max_delivery_time)
-        except ValueError:
-            raise ValidationError({"max_delivery_time": "Must be an integer."})
-        queryset = queryset.annotate(min_delivery_time=Min('details__delivery_time_in_days')) \
-                           .filter(min_delivery_time__lte=max_delivery_time)
+            result = import_offers(
+                READERS[import_format](lines), profile, result=OfferImportResult(self.max_errors)
+            )
+        except UnicodeDecodeError:
+            raise ValidationError({'file': 'File must be UTF-8 encoded.'})
+        if not result.created and not result.error_count:
+            raise ValidationError({'file': 'The submitted file contains no offers.'})
 
-     return queryset
+        return Response({
+            'created': result.created,
+            'error_count': result.error_count,
+            'errors': result.errors,
+        }, status=status.HTTP_201_CREATED if result.created else status.HTTP_400_BAD_REQUEST)
 
 
-class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OfferDetailView(ConditionalRequestMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a single offer.
 
@@ -93,8 +192,22 @@ class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
     Behavior:
         GET: Uses OfferDetailViewSerializer.
         PATCH, DELETE: Uses OfferSerializer.
+
+    The owner and the details are loaded with the offer, so the permission
+    check and the serializers do not query again.
+
+    Conditional requests:
+        ETag / Last-Modified from the updated_at of the offer and of its
+        newest detail (see ConditionalRequestMixin); 304 for unchanged
+        GETs, 412 for PATCH/DELETE with a stale If-Match.
     """
-    queryset = Offer.objects.all()
+    queryset = Offer.objects.select_related('profile__user').prefetch_related('details')
+    version_fields = (
+        'updated_at',
+        # A PATCH that only changes details does not save the offer
+        Subquery(OfferDetail.objects.filter(offer=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]),
+    )
+    conditional_owner_lookup = 'profile__user_id'
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     lookup_field = 'pk'
 
@@ -103,13 +216,19 @@ class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
             return OfferDetailViewSerializer
         return OfferSerializer
 
+    def get_last_modified(self, version):
+        return int(max(filter(None, version)).timestamp())
+
 
-class OfferDetailRetrieveView(generics.RetrieveAPIView):
+class OfferDetailRetrieveView(ConditionalRequestMixin, generics.RetrieveAPIView):
     """
     Retrieve details of a specific OfferDetail.
 
     Permissions:
         Only authenticated users.
+
+    Conditional requests:
+        ETag / Last-Modified from updated_at; 304 for unchanged GETs.
     """
     queryset = OfferDetail.objects.all()
     serializer_class = OfferDetailSerializer
@@ -117,31 +236,81 @@ class OfferDetailRetrieveView(generics.RetrieveAPIView):
     lookup_field = 'pk'
 
 
-class OrderView(generics.ListCreateAPIView):
+class OrderView(StreamingListMixin, FastListMixin, generics.ListCreateAPIView):
     """
-    List all orders or create a new order.
+    List the caller's orders or create a new order.
 
     Permissions:
         Only customers can create orders.
+        Users only see orders they placed or received.
+
+    Pagination:
+        Keyset pagination ordered by (created_at, id); `?stream=1` streams
+        all of the caller's orders instead.
     """
     queryset = Order.objects.all()
     permission_classes = [IsCustomerForPost]
+    ordering = ['created_at']
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return OrderCreateserializer
         return OrderSerializer
+
+    def get_queryset(self):
+        """
+        Return the orders where the caller is customer or business user.
+
+        The two sides are combined with a UNION of two index seeks instead
+        of an OR over both foreign keys, which would scan the whole table.
+        """
+        user_id = self.request.user.id
+        own_order_ids = Order.objects.filter(customer_user__user_id=user_id).values('pk') \
+            .union(Order.objects.filter(business_user__user_id=user_id).values('pk'))
+
+        return super().get_queryset().filter(pk__in=own_order_ids)
     
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        """
+        Place an order in one short transaction: one joined lookup of the
+        offer detail and the customer profile, one INSERT, and a response
+        built from the objects in memory.
+
+        With an `Idempotency-Key` header, retrying the request returns the
+        order created by the first attempt (marked `Idempotent-Replayed:
+        true`) instead of placing another one.
+        """
+        idempotency_key = request.headers.get('Idempotency-Key') or None
+        if idempotency_key is not None and len(idempotency_key) > Order._meta.get_field('idempotency_key').max_length:
+            raise ValidationError({'Idempotency-Key': ['Ensure this header has at most 255 characters.']})
 
-        # Create the order
-        order = serializer.save()
+        serializer = self.get_serializer(data=request.data)
+        headers = {}
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            try:
+                with transaction.atomic():
+                    # Create the order
+                    order = serializer.save(idempotency_key=idempotency_key)
+            except IntegrityError:
+                order = self.get_replayed_order(idempotency_key, serializer.validated_data['offer_detail'])
+                if order is None:
+                    raise
+                headers['Idempotent-Replayed'] = 'true'
 
         # Return full order data in response
         response_serializer = OrderSerializer(order, context={'request': request})
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def get_replayed_order(self, idempotency_key, offer_detail):
+        """Return the order the customer already placed with this key, if any."""
+        if idempotency_key is None:
+            return None
+        order = Order.objects \
+            .filter(customer_user_id=offer_detail.customer_profile_id, idempotency_key=idempotency_key).first()
+        if order is not None and order.offer_detail_id != offer_detail.pk:
+            raise ValidationError({'Idempotency-Key': ['This key was already used for a different order.']})
+        return order
 
 
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -177,6 +346,65 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(full_serializer.data)
 
 
+def get_business_order_counts(business_user_ids):
+    """
+    Count the orders of every status for the given business users.
+
+    Runs a single grouped query over the (business_user, status) index and
+    returns a dict mapping each business user id to a dict of
+    status -> count. Ids that do not belong to a business user are left
+    out of the result.
+    """
+    statuses = [value for value, label in Order.ORDER_STATUS_CHOICES]
+    counts = {
+        status_value: Count('received_orders', filter=Q(received_orders__status=status_value))
+        for status_value in statuses
+    }
+    rows = Profile.objects.filter(user_id__in=business_user_ids, user__type='business') \
+        .values('user_id') \
+        .annotate(**counts) \
+        .order_by()
+
+    return {row.pop('user_id'): row for row in rows}
+
+
+class BusinessUserOrderCountsView(APIView):
+    """
+    Return the order count per status for one or many business users.
+
+    Query parameters:
+        business_user_id: User id of a business user. May be repeated or
+            given as a comma-separated list (at most MAX_BUSINESS_USERS ids).
+
+    Permissions:
+        Only authenticated users.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_BUSINESS_USERS = 100
+
+    def get(self, request):
+        raw_ids = [
+            value
+            for param in request.query_params.getlist('business_user_id')
+            for value in param.split(',') if value
+        ]
+        if not raw_ids:
+            raise ValidationError({"business_user_id": "This parameter is required."})
+        if len(raw_ids) > self.MAX_BUSINESS_USERS:
+            raise ValidationError({"business_user_id": f"At most {self.MAX_BUSINESS_USERS} ids are allowed."})
+        try:
+            business_user_ids = [int(value) for value in raw_ids]
+        except ValueError:
+            raise ValidationError({"business_user_id": "Must be a list of integers."})
+
+        counts = get_business_order_counts(business_user_ids)
+        data = [
+            {'business_user_id': user_id, **user_counts}
+            for user_id, user_counts in counts.items()
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class BusinessUserOrderCountView(APIView):
     """
     Return the count of 'in_progress' orders for a specific business user.
@@ -187,14 +415,11 @@ class BusinessUserOrderCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, business_user_id):
-        user = get_object_or_404(User, id=business_user_id, type='business')
-
-        count = Order.objects.filter(
-            business_user__user=user,
-            status='in_progress'
-        ).count()
+        counts = get_business_order_counts([business_user_id])
+        if business_user_id not in counts:
+            raise Http404
 
-        return Response({'order_count': count}, status=status.HTTP_200_OK)
+        return Response({'order_count': counts[business_user_id]['in_progress']}, status=status.HTTP_200_OK)
 
 
 class BusinessUserOrderCompletedCountView(APIView):
@@ -207,17 +432,14 @@ class BusinessUserOrderCompletedCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, business_user_id):
-        user = get_object_or_404(User, id=business_user_id, type='business')
+        counts = get_business_order_counts([business_user_id])
+        if business_user_id not in counts:
+            raise Http404
 
-        count = Order.objects.filter(
-            business_user__user=user,
-            status='completed'
-        ).count()
+        return Response({'completed_order_count': counts[business_user_id]['completed']}, status=status.HTTP_200_OK)
 
-        return Response({'completed_order_count': count}, status=status.HTTP_200_OK)
 
-
-class ReviewCreateView(generics.ListCreateAPIView):
+class ReviewCreateView(ReplicaReadMixin, StreamingListMixin, FastListMixin, generics.ListCreateAPIView):
     """
     List all reviews or create a new review.
 
@@ -229,9 +451,14 @@ class ReviewCreateView(generics.ListCreateAPIView):
 
     Filtering:
         Can filter by business_user_id and reviewer_id.
+
+    Pagination:
+        Keyset pagination over the chosen ordering plus id; `?stream=1`
+        streams all matching reviews instead (authenticated users only).
     """
     queryset = Review.objects.all()
     permission_classes = [IsCustomerForPost]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['updated_at', 'rating']
     ordering = ['updated_at']
 
@@ -251,10 +478,6 @@ class ReviewCreateView(generics.ListCreateAPIView):
         if reviewer_id:
             queryset = queryset.filter(reviewer__user__id=reviewer_id)
 
-        ordering = self.request.query_params.get('ordering')
-        if ordering in ['updated_at', 'rating']:
-            queryset = queryset.order_by(ordering)
-
         return queryset
 
     def create(self, request, *args, **kwargs):
@@ -267,16 +490,25 @@ class ReviewCreateView(generics.ListCreateAPIView):
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ReviewDetailView(ConditionalRequestMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a review.
 
     Permissions:
         Only the reviewer may update or delete their review.
+
+    Conditional requests:
+        ETag / Last-Modified from updated_at; 304 for unchanged GETs, 412
+        for PATCH/DELETE with a stale If-Match. Only for the reviewer.
     """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated, IsReviewOwnerOrReadOnly]
+    conditional_owner_lookup = 'reviewer__user_id'
+
+    def conditional_allowed(self, request, owner_id):
+        # get_object() rejects everyone but the reviewer, reads included
+        return owner_id == request.user.id
 
     def get_object(self):
         review = super().get_object()
@@ -286,7 +518,7 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
         return review
 
 
-class BaseInfoView(APIView):
+class BaseInfoView(ReplicaReadMixin, APIView):
     """
     Provides aggregated base information about the system.
 
@@ -297,28 +529,43 @@ class BaseInfoView(APIView):
             - Total number of business profiles
             - Total number of offers
 
+        The values are read from the incrementally maintained PlatformStats
+        row, so the response costs a single primary key lookup. Responses
+        carry Cache-Control and ETag headers; If-None-Match is answered
+        with 304.
+
     Error Handling:
         Returns 500 with a generic error message if an exception occurs.
     """
 
     permission_classes = [AllowAny]
+    authentication_classes = []
+
     def get(self, request):
         try:
-            review_count = Review.objects.count()
-            average_rating = Review.objects.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0.0
-            business_profile_count = Profile.objects.filter(user__type='business').count()
-            offer_count = Offer.objects.count()
+            stats = PlatformStats.load()
 
             data = {
-                "review_count": review_count,
-                "average_rating": round(average_rating, 1),
-                "business_profile_count": business_profile_count,
-                "offer_count": offer_count
+                "review_count": stats.review_count,
+                "average_rating": round(stats.average_rating, 1),
+                "business_profile_count": stats.business_profile_count,
+                "offer_count": stats.offer_count
             }
-            return Response(data, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response(
                 {"detail": "An internal error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+        etag = quote_etag('stats-{}-{}-{}-{}'.format(
+            stats.review_count, stats.rating_sum, stats.business_profile_count, stats.offer_count
+        ))
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data, status=status.HTTP_200_OK)
+
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.BASE_INFO_CACHE_MAX_AGE)
+        return response
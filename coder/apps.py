@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'coder'
+
+    def ready(self):
+        from coder import signals  # noqa: F401
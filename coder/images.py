@@ -0,0 +1,132 @@
+"""
+Resized WebP renditions of uploaded offer images and profile pictures.
+
+When a model with an image is saved with a new upload, the signal handlers
+in coder.signals call schedule_renditions(). Once the transaction commits, a
+background thread pool (IMAGE_RENDITION_WORKERS threads; 0 runs inline)
+writes one WebP per entry in IMAGE_RENDITIONS next to the original, e.g.
+`offers/logo.jpg` -> `offers/logo.thumb.webp`. The names are then stored in
+the model's renditions JSON field:
+
+    {"source": "offers/logo.jpg", "thumb": "offers/logo.thumb.webp", ...}
+
+Images are only scaled down, never up. The upload request never waits for
+the resizing.
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def rendition_name(name, label):
+    """Return the storage name of a rendition of `name`."""
+    root, ext = os.path.splitext(name)
+    return f'{root}.{label}.webp'
+
+
+def needs_renditions(instance, field_name, renditions_field):
+    """True if the instance's image differs from the one its renditions were made from."""
+    name = getattr(instance, field_name).name or ''
+    return (getattr(instance, renditions_field) or {}).get('source', '') != name
+
+
+def schedule_renditions(instance, field_name, renditions_field):
+    """Create the renditions of the instance's image after the current transaction commits."""
+    args = (instance._meta.label, instance.pk, field_name, renditions_field, getattr(instance, field_name).name or '')
+    transaction.on_commit(lambda: _submit(*args))
+
+
+def _submit(*args):
+    pool = _get_pool()
+    if pool is None:
+        generate_renditions(*args)
+    else:
+        pool.submit(_run_in_worker, *args)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None and settings.IMAGE_RENDITION_WORKERS:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS, thread_name_prefix='image-renditions'
+            )
+        return _pool
+
+
+def _run_in_worker(*args):
+    close_old_connections()
+    try:
+        generate_renditions(*args)
+    except Exception:
+        logger.exception('Creating image renditions failed for %s', args)
+    finally:
+        close_old_connections()
+
+
+def generate_renditions(model_label, pk, field_name, renditions_field, name):
+    """
+    Write the renditions of `name` and record them on the model instance.
+
+    Does nothing if the instance was deleted or got a different image in the
+    meantime. Renditions of the previous image are deleted.
+    """
+    model = apps.get_model(model_label)
+    storage = model._meta.get_field(field_name).storage
+
+    renditions = {'source': name}
+    if name:
+        try:
+            renditions.update(_write_renditions(storage, name))
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.warning('Could not create renditions of %s', name, exc_info=True)
+
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=pk).first()
+        if instance is None or (getattr(instance, field_name).name or '') != name:
+            return
+        previous = getattr(instance, renditions_field) or {}
+        setattr(instance, renditions_field, renditions)
+        # A regular save so updated_at, ETags and cached pages follow
+        instance.save(update_fields=[renditions_field, 'updated_at'])
+
+    for label, old_name in previous.items():
+        if label != 'source' and old_name not in renditions.values():
+            storage.delete(old_name)
+
+
+def _write_renditions(storage, name):
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    written = {}
+    for label, width in settings.IMAGE_RENDITIONS.items():
+        rendition = image.copy()
+        rendition.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(buffer, 'WEBP', quality=settings.IMAGE_RENDITION_QUALITY, method=4)
+
+        target = rendition_name(name, label)
+        if storage.exists(target):
+            storage.delete(target)
+        written[label] = storage.save(target, ContentFile(buffer.getvalue()))
+    return written
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from coder.models import Offer
+
+
+class Command(BaseCommand):
+    """
+    Recompute the denormalized min_price / min_delivery_time of all offers.
+
+    Usage:
+        python manage.py backfill_offer_min_values
+    """
+    help = 'Recompute Offer.min_price and Offer.min_delivery_time from the offer details.'
+
+    def handle(self, *args, **options):
+        updated = Offer.objects.all().refresh_min_values()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} offers.'))
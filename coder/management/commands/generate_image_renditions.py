@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from coder.images import generate_renditions, needs_renditions
+from coder.models import Offer, Profile
+
+
+class Command(BaseCommand):
+    """
+    Create missing image renditions for offers and profiles.
+
+    New uploads get their renditions automatically; run this once for images
+    uploaded before renditions existed, or with --all after changing
+    IMAGE_RENDITIONS.
+
+    Usage:
+        python manage.py generate_image_renditions
+        python manage.py generate_image_renditions --all
+    """
+    help = 'Create resized WebP renditions for offer images and profile pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recreate existing renditions too.')
+
+    def handle(self, *args, **options):
+        targets = [
+            (Offer.objects.exclude(image='').exclude(image__isnull=True), 'image', 'image_renditions'),
+            (Profile.objects.exclude(file=''), 'file', 'file_renditions'),
+        ]
+        count = 0
+        for queryset, field_name, renditions_field in targets:
+            for instance in queryset.only('pk', field_name, renditions_field).iterator():
+                if options['all'] or needs_renditions(instance, field_name, renditions_field):
+                    generate_renditions(
+                        instance._meta.label, instance.pk, field_name, renditions_field,
+                        getattr(instance, field_name).name,
+                    )
+                    count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Created renditions for {count} images.'))
@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from coder.api.importing import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, READERS, OfferImportResult, guess_format, import_offers
+from coder.models import Profile
+
+
+class CommandImportResult(OfferImportResult):
+    """Import result that writes each rejected row out instead of keeping it."""
+
+    def __init__(self, stream):
+        super().__init__(max_errors=0)
+        self.stream = stream
+
+    def add_error(self, line, errors):
+        super().add_error(line, errors)
+        self.stream.write(f'line {line}: {errors}')
+
+
+class Command(BaseCommand):
+    """
+    Bulk-create offers for a business user from a JSON Lines or CSV file.
+
+    The file is streamed and inserted in chunks (see coder.api.importing),
+    so files larger than memory can be imported. Rejected rows are written
+    to stderr with their line number.
+
+    Usage:
+        python manage.py import_offers offers.jsonl --user acme
+        python manage.py import_offers offers.csv --user acme --batch-size 1000
+        cat offers.jsonl | python manage.py import_offers - --user acme
+    """
+    help = 'Import offers for a business user from a JSON Lines or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin.")
+        parser.add_argument('--user', required=True, help='Username of the business user owning the offers.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension (jsonl).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            profile = Profile.objects.get(user__username=options['user'], user__type='business')
+        except Profile.DoesNotExist:
+            raise CommandError(f"No business user named '{options['user']}'.")
+
+        path = options['path']
+        import_format = options['format'] or guess_format(path)
+        result = CommandImportResult(self.stderr)
+
+        if path == '-':
+            import_offers(READERS[import_format](sys.stdin), profile, options['batch_size'], result)
+        else:
+            with open(path, newline='', encoding='utf-8') as lines:
+                import_offers(READERS[import_format](lines), profile, options['batch_size'], result)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} offers, {result.error_count} rows rejected.'
+        ))
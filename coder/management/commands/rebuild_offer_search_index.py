@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from coder.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the offer full-text search index from the Offer table.
+
+    Needed after offers were written without signals (raw SQL, fixtures
+    loaded with --raw, restores). A no-op on PostgreSQL, where the index
+    is maintained by the database.
+
+    Usage:
+        python manage.py rebuild_offer_search_index
+    """
+    help = 'Rebuild the offer full-text search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend(options['database']).rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} offers.'))
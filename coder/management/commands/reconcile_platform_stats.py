@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from coder.models import PlatformStats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the platform statistics used by /api/base-info/.
+
+    The counters are maintained incrementally by signals; run this command
+    periodically (e.g. from cron) to correct any drift.
+
+    Usage:
+        python manage.py reconcile_platform_stats
+    """
+    help = 'Recompute the PlatformStats counters from the source tables.'
+
+    def handle(self, *args, **options):
+        before = PlatformStats.load()
+        after = PlatformStats.reconcile()
+
+        for field in ['review_count', 'rating_sum', 'business_profile_count', 'offer_count']:
+            old, new = getattr(before, field), getattr(after, field)
+            if old != new:
+                self.stdout.write(f'{field}: {old} -> {new}')
+
+        self.stdout.write(self.style.SUCCESS('Platform stats reconciled.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from coder.models import Profile
+
+
+class Command(BaseCommand):
+    """
+    Recompute the review aggregates of all profiles.
+
+    review_count, rating_sum, average_rating and the rating histogram are
+    maintained incrementally by signals; run this command periodically
+    (e.g. from cron) to correct any drift.
+
+    Usage:
+        python manage.py reconcile_review_stats [--batch-size 1000]
+    """
+    help = 'Recompute the review aggregates of all profiles from the Review table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profiles read and written per batch.')
+
+    def handle(self, *args, **options):
+        corrected = Profile.reconcile_review_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Review stats reconciled, {corrected} profiles corrected.'))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:03
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """Keep only the latest review per (reviewer, business_user) pair."""
+    Review = apps.get_model('coder', 'Review')
+    duplicates = Review.objects.values('reviewer', 'business_user') \
+        .annotate(latest_id=Max('id'), total=Count('id')) \
+        .filter(total__gt=1) \
+        .order_by()
+    for duplicate in duplicates:
+        Review.objects.filter(
+            reviewer=duplicate['reviewer'],
+            business_user=duplicate['business_user'],
+        ).exclude(id=duplicate['latest_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0010_offer_min_values'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['updated_at'], name='offer_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['updated_at'], name='review_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['rating'], name='review_rating_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('reviewer', 'business_user'), name='unique_review_per_business'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:04
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def create_stats_row(apps, schema_editor):
+    PlatformStats = apps.get_model('coder', 'PlatformStats')
+    Review = apps.get_model('coder', 'Review')
+    Profile = apps.get_model('coder', 'Profile')
+    Offer = apps.get_model('coder', 'Offer')
+    review_totals = Review.objects.aggregate(count=Count('id'), rating_sum=Sum('rating'))
+    PlatformStats.objects.create(
+        pk=1,
+        review_count=review_totals['count'],
+        rating_sum=review_totals['rating_sum'] or 0,
+        business_profile_count=Profile.objects.filter(user__type='business').count(),
+        offer_count=Offer.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0004_user_type'),
+        ('coder', '0011_offer_offer_updated_at_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('business_profile_count', models.IntegerField(default=0)),
+                ('offer_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_stats_row, migrations.RunPython.noop),
+    ]
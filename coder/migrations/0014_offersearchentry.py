@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The index structures of the vendor search backends in coder.search, as
+# they were when this migration was written
+FTS_TABLE = 'coder_offer_fts'
+GIN_INDEX = 'offer_search_idx'
+
+
+def gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(SearchVector('title', 'description', config='english'), name=GIN_INDEX)
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description) '
+            f'SELECT id, title, description FROM coder_offer'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('coder', 'Offer'), gin_index())
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('coder', 'Offer'), gin_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSearchEntry',
+            fields=[
+                ('offer', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='coder.offer')),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('document', models.TextField(db_column='coder_offer_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'coder_offer_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0015_offerdetail_updated_at_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='file_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0016_offer_image_renditions_profile_file_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('customer_user', 'idempotency_key'), name='order_customer_idempotency_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+SNAPSHOT_FIELDS = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
+
+def backfill_order_snapshots(apps, schema_editor):
+    Order = apps.get_model('coder', 'Order')
+    OfferDetail = apps.get_model('coder', 'OfferDetail')
+    offer_detail = OfferDetail.objects.filter(pk=OuterRef('offer_detail_id'))
+    Order.objects.update(**{
+        field: Subquery(offer_detail.values(field)[:1]) for field in SNAPSHOT_FIELDS
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0017_order_idempotency_key_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='revisions',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(default=list),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'Basic'), ('standard', 'Standard'), ('premium', 'Premium')], default='basic', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_order_snapshots, migrations.RunPython.noop),
+    ]
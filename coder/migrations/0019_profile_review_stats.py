@@ -0,0 +1,94 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:11
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def backfill_review_stats(apps, schema_editor):
+    Profile = apps.get_model('coder', 'Profile')
+    Review = apps.get_model('coder', 'Review')
+    reviews = Review.objects.filter(business_user=OuterRef('pk')).order_by().values('business_user')
+
+    def aggregate(expression):
+        return Coalesce(Subquery(reviews.annotate(value=expression).values('value')), 0)
+
+    review_count, rating_sum = aggregate(Count('id')), aggregate(Sum('rating'))
+    Profile.objects.update(
+        review_count=review_count,
+        rating_sum=rating_sum,
+        average_rating=Coalesce(
+            Cast(rating_sum, FloatField()) / NullIf(Cast(review_count, FloatField()), Value(0.0)), Value(0.0),
+        ),
+        **{
+            f'rating_{rating}_count': aggregate(Count('id', filter=Q(rating=rating)))
+            for rating in range(1, 6)
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder', '0018_order_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='average_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_1_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_2_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_3_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_4_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_5_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='review_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='rating',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['review_count', 'id'], name='profile_review_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['average_rating', 'id'], name='profile_avg_rating_id_idx'),
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
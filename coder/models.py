@@ -1,4 +1,8 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, F, FloatField, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 from auth_app.models import User
 
 
@@ -16,26 +20,140 @@ class Profile(models.Model):
         first_name: Optional first name.
         last_name: Optional last name.
         file: Optional profile picture or file upload.
+        file_renditions: Resized WebP versions of `file` (see coder.images).
         location: Optional location string.
         tel: Optional telephone number.
         description: Optional free-text description.
         working_hours: Optional working hours info.
+        review_count: Number of reviews the profile received.
+        rating_sum: Sum of their ratings.
+        average_rating: rating_sum / review_count, 0 without reviews.
+        rating_1_count ... rating_5_count: Number of reviews per rating.
         uploaded_at: Timestamp when profile was created.
+        updated_at: Timestamp when profile was last updated.
+
+    The review aggregates are kept up to date by the signal handlers in
+    coder.signals and corrected by the reconcile_review_stats command.
     """
+    RATING_VALUES = range(1, 6)
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     username = models.CharField(max_length=150, blank=True, default='') 
     first_name = models.CharField(max_length=30, blank=True, default='')
     last_name = models.CharField(max_length=30, blank=True, default='')
     file = models.FileField(upload_to='profile_pics/', default='', blank=True)
+    file_renditions = models.JSONField(default=dict, blank=True)
     location = models.CharField(max_length=255, blank=True, default='')
     tel = models.CharField(max_length=20, blank=True, default='')
     description = models.TextField(blank=True, default='')
     working_hours = models.CharField(max_length=50, blank=True, default='')
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+    rating_1_count = models.IntegerField(default=0)
+    rating_2_count = models.IntegerField(default=0)
+    rating_3_count = models.IntegerField(default=0)
+    rating_4_count = models.IntegerField(default=0)
+    rating_5_count = models.IntegerField(default=0)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['uploaded_at', 'id'], name='profile_uploaded_at_id_idx'),
+            models.Index(fields=['review_count', 'id'], name='profile_review_count_id_idx'),
+            models.Index(fields=['average_rating', 'id'], name='profile_avg_rating_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s profile"
 
+    @property
+    def rating_histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}_count') for rating in self.RATING_VALUES}
+
+    @classmethod
+    def update_review_stats(cls, pk, added=None, removed=None):
+        """
+        Atomically apply a review change to a profile's aggregates in one
+        UPDATE: `added` is a rating that now counts, `removed` one that no
+        longer does, e.g. update_review_stats(7, added=5, removed=3).
+        """
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+        values = {
+            'review_count': F('review_count') + count_delta,
+            'rating_sum': F('rating_sum') + sum_delta,
+            # Every SET expression sees the old row, so apply the deltas here too
+            'average_rating': _average(F('rating_sum') + sum_delta, F('review_count') + count_delta),
+            'updated_at': timezone.now(),
+        }
+        for rating, delta in ((added, 1), (removed, -1)):
+            if rating in cls.RATING_VALUES:
+                field = f'rating_{rating}_count'
+                values[field] = values.get(field, F(field)) + delta
+        cls.objects.filter(pk=pk).update(**values)
+
+    @classmethod
+    def reconcile_review_stats(cls, batch_size=1000):
+        """
+        Recompute the review aggregates of every profile from the Review
+        table and store those that drifted. Returns the number of corrected
+        profiles.
+        """
+        reviews = Review.objects.filter(business_user=OuterRef('pk')).order_by().values('business_user')
+
+        def aggregate(expression):
+            return Coalesce(Subquery(reviews.annotate(value=expression).values('value')), 0)
+
+        counted = {
+            'review_count': aggregate(Count('id')),
+            'rating_sum': aggregate(Sum('rating')),
+            **{
+                f'rating_{rating}_count': aggregate(Count('id', filter=Q(rating=rating)))
+                for rating in cls.RATING_VALUES
+            },
+        }
+        fields = [*counted, 'average_rating']
+        rows = cls.objects.order_by('pk') \
+            .annotate(**{f'expected_{field}': expression for field, expression in counted.items()}) \
+            .values('pk', *fields, *[f'expected_{field}' for field in counted])
+
+        corrected = []
+        now = timezone.now()
+        for row in rows.iterator(chunk_size=batch_size):
+            expected = {field: row[f'expected_{field}'] for field in counted}
+            count = expected['review_count']
+            expected['average_rating'] = expected['rating_sum'] / count if count else 0.0
+            if any(row[field] != expected[field] for field in fields):
+                corrected.append(cls(pk=row['pk'], updated_at=now, **expected))
+
+        cls.objects.bulk_update(corrected, [*fields, 'updated_at'], batch_size=batch_size)
+        return len(corrected)
+
+
+def _average(total, count):
+    return Coalesce(Cast(total, FloatField()) / NullIf(Cast(count, FloatField()), Value(0.0)), Value(0.0))
+
+
+class OfferQuerySet(models.QuerySet):
+    """
+    QuerySet for offers with helpers for the denormalized min values.
+    """
+
+    def refresh_min_values(self):
+        """
+        Recompute min_price and min_delivery_time from the offer details.
+
+        Runs as a single UPDATE over all offers in the queryset and returns
+        the number of updated rows.
+        """
+        details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        return self.update(
+            min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+            min_delivery_time=Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+        )
+
 
 class Offer(models.Model):
     """
@@ -44,18 +162,31 @@ class Offer(models.Model):
     Fields:
         title: Title of the offer.
         image: Optional image representing the offer.
+        image_renditions: Resized WebP versions of `image` (see coder.images).
         description: Detailed description of the offer.
         profile: ForeignKey to the business profile who created the offer.
+        min_price: Lowest price of all offer details (denormalized).
+        min_delivery_time: Shortest delivery time of all offer details (denormalized).
         created_at: Timestamp when offer was created.
         updated_at: Timestamp when offer was last updated.
     """
     title = models.CharField(max_length=255)
     image = models.ImageField(upload_to='offers/', null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True)
     description = models.TextField()
     profile = models.ForeignKey(Profile, related_name='offers', on_delete=models.CASCADE)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, db_index=True)
+    min_delivery_time = models.PositiveIntegerField(null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='offer_updated_at_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -72,6 +203,7 @@ class OfferDetail(models.Model):
         price: Price for this offer detail.
         features: JSON field listing features (alternative to ManyToMany).
         offer_type: Type of offer (basic, standard, premium).
+        updated_at: Timestamp when the detail was last updated.
     """
     OFFER_TYPE_CHOICES = [
         ('basic', 'Basic'),
@@ -86,11 +218,41 @@ class OfferDetail(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     features = models.JSONField()  # Alternatively, a ManyToMany relation to a Feature model
     offer_type = models.CharField(max_length=20, choices=OFFER_TYPE_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
 
+class OfferSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 offer index (see coder.search).
+
+    Unmanaged: the table only exists on SQLite, is created by a migration
+    and written with raw SQL. The model lets offer querysets join the index
+    and order by its bm25 rank.
+
+    Fields:
+        offer: The indexed offer; stored as the FTS rowid.
+        title: Indexed copy of the offer title.
+        description: Indexed copy of the offer description.
+        document: FTS5 hidden column named after the table; left side of MATCH.
+        rank: FTS5 hidden bm25 rank column (lower is better).
+    """
+    offer = models.OneToOneField(
+        Offer, primary_key=True, db_column='rowid', related_name='search_entry',
+        on_delete=models.DO_NOTHING, db_constraint=False,
+    )
+    title = models.TextField()
+    description = models.TextField()
+    document = models.TextField(db_column='coder_offer_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'coder_offer_fts'
+
+
 class Order(models.Model):
     """
     Represents an order placed by a customer for an offer detail.
@@ -99,7 +261,12 @@ class Order(models.Model):
         offer_detail: The OfferDetail ordered.
         customer_user: Profile of the customer placing the order.
         business_user: Profile of the business receiving the order.
+        title, revisions, delivery_time_in_days, price, features, offer_type:
+            Snapshot of the ordered OfferDetail, taken when the order is
+            placed, so later offer edits do not change past orders.
         status: Current order status.
+        idempotency_key: Idempotency-Key header of the request that placed
+            the order, unique per customer.
         created_at: Timestamp when the order was created.
         updated_at: Timestamp when the order was last updated.
     """
@@ -108,17 +275,44 @@ class Order(models.Model):
         ('completed', 'Completed'),
         ('canceled', 'Canceled'),
     ]
+    SNAPSHOT_FIELDS = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
 
     offer_detail = models.ForeignKey(OfferDetail, related_name='orders', on_delete=models.CASCADE)
     customer_user = models.ForeignKey(Profile, related_name='orders', on_delete=models.CASCADE)
     business_user = models.ForeignKey(Profile, related_name='received_orders', on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    revisions = models.PositiveIntegerField()
+    delivery_time_in_days = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    features = models.JSONField()
+    offer_type = models.CharField(max_length=20, choices=OfferDetail.OFFER_TYPE_CHOICES)
     status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='in_progress')
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Covers the per-status order counts of a business user
+            models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+            models.Index(fields=['created_at', 'id'], name='order_created_at_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['customer_user', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='order_customer_idempotency_key_uniq',
+            ),
+        ]
+
+    @classmethod
+    def snapshot(cls, offer_detail):
+        """Return the snapshot field values for an order of `offer_detail`."""
+        return {field: getattr(offer_detail, field) for field in cls.SNAPSHOT_FIELDS}
+
     def __str__(self):
         # Zeigt z. B. den OfferDetail Titel + Status
-        return f"Order #{self.id} - {self.offer_detail.title} ({self.status})"
+        return f"Order #{self.id} - {self.title} ({self.status})"
 
 
 class Review(models.Model):
@@ -135,11 +329,88 @@ class Review(models.Model):
     """
     business_user = models.ForeignKey(Profile, related_name='reviews', on_delete=models.CASCADE)
     reviewer = models.ForeignKey(Profile, related_name='given_reviews', on_delete=models.CASCADE)
-    rating = models.PositiveIntegerField()
+    rating = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     description = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # A customer may review each business only once
+            models.UniqueConstraint(fields=['reviewer', 'business_user'], name='unique_review_per_business'),
+        ]
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='review_updated_at_id_idx'),
+            models.Index(fields=['rating', 'id'], name='review_rating_id_idx'),
+        ]
+
     def __str__(self):
         # Zeigt z. B. Reviewer → Business + Bewertung
         return f"Review by {self.reviewer.user.username} for {self.business_user.user.username} "
+
+
+class PlatformStats(models.Model):
+    """
+    Single-row table with running counters for the platform statistics.
+
+    Kept up to date by the signal handlers in coder.signals and corrected
+    by the reconcile_platform_stats management command.
+
+    Fields:
+        review_count: Number of reviews.
+        rating_sum: Sum of all review ratings.
+        business_profile_count: Number of business profiles.
+        offer_count: Number of offers.
+        updated_at: Timestamp of the last counter change.
+    """
+    SINGLETON_PK = 1
+
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    business_profile_count = models.IntegerField(default=0)
+    offer_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Platform stats ({self.updated_at})"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0.0
+        return self.rating_sum / self.review_count
+
+    @classmethod
+    def load(cls):
+        """Return the statistics row, creating it on first use."""
+        # A plain read first: get_or_create always goes to the primary
+        stats = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if stats is None:
+            stats, created = cls.objects.get_or_create(pk=cls.SINGLETON_PK)
+        return stats
+
+    @classmethod
+    def increment(cls, **deltas):
+        """
+        Atomically add the given deltas to the counters, e.g.
+        PlatformStats.increment(review_count=1, rating_sum=4).
+        """
+        values = {field: F(field) + delta for field, delta in deltas.items()}
+        values['updated_at'] = timezone.now()
+        if not cls.objects.filter(pk=cls.SINGLETON_PK).update(**values):
+            cls.reconcile()
+
+    @classmethod
+    def reconcile(cls):
+        """Recompute all counters from the source tables and return the row."""
+        review_totals = Review.objects.aggregate(count=Count('id'), rating_sum=Sum('rating'))
+        stats, created = cls.objects.update_or_create(
+            pk=cls.SINGLETON_PK,
+            defaults={
+                'review_count': review_totals['count'],
+                'rating_sum': review_totals['rating_sum'] or 0,
+                'business_profile_count': Profile.objects.filter(user__type='business').count(),
+                'offer_count': Offer.objects.count(),
+            },
+        )
+        return stats
@@ -0,0 +1,153 @@
+"""
+Full-text search over offer titles and descriptions.
+
+The backend is chosen by the OFFER_SEARCH_BACKEND setting (a dotted path)
+or, if that is None, by the database vendor:
+
+- SQLite: an FTS5 virtual table (coder_offer_fts) keyed by the offer id,
+  kept in sync by the Offer signals in coder.signals.
+- PostgreSQL: a GIN index over to_tsvector(title || description). The
+  database maintains the index itself, so there is nothing to sync.
+- Anything else: case-insensitive LIKE over both columns, unranked.
+
+Every backend filters a queryset down to the matching offers and
+annotates a `search_rank` (higher is better), so search combines with
+all other filters on the queryset.
+
+The FTS5 table and the GIN index are created by migration 0014; a custom
+backend has to bring its own migration for any structures it needs.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, FloatField, Lookup, Q, Value
+from django.utils.module_loading import import_string
+
+from coder.models import OfferSearchEntry
+
+
+class BaseSearchBackend:
+    """Backend interface; the sync hooks are no-ops by default."""
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def index(self, offers):
+        """Add or refresh the given offers in the index."""
+
+    def remove(self, offer_ids):
+        """Drop the given offer ids from the index."""
+
+    def rebuild(self):
+        """Recreate the whole index from the Offer table; returns the number of indexed offers."""
+        from coder.models import Offer
+        return Offer.objects.using(self.using).count()
+
+    def search(self, queryset, query):
+        """Return the queryset filtered to offers matching `query`, annotated with `search_rank`."""
+        raise NotImplementedError
+
+
+@OfferSearchEntry._meta.get_field('document').register_lookup
+class FTSMatch(Lookup):
+    """`search_entry__document__match=<query>` -> `<fts table> MATCH <query>`."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Fallback without an index: LIKE '%term%' on title and description for every term."""
+
+    def search(self, queryset, query):
+        for term in query.split():
+            queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index in a separate virtual table whose rowid is the offer id.
+
+    Searches join the table through the unmanaged OfferSearchEntry model, so
+    matching and bm25 ranking happen in one pass over the FTS index. Every
+    term of the query is matched as a prefix, so `desi` finds `design`.
+    """
+    table = 'coder_offer_fts'
+
+    def index(self, offers):
+        rows = [(offer.pk, offer.title, offer.description) for offer in offers]
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [row[:1] for row in rows])
+            cursor.executemany(f'INSERT INTO {self.table} (rowid, title, description) VALUES (%s, %s, %s)', rows)
+
+    def remove(self, offer_ids):
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in offer_ids])
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, description) '
+                f'SELECT id, title, description FROM coder_offer'
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if match is None:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+        return queryset.filter(search_entry__document__match=match) \
+            .annotate(search_rank=-F('search_entry__rank'))
+
+    @staticmethod
+    def match_expression(query):
+        """Turn free text into an FTS5 query: every word quoted, as a prefix, all required."""
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+    tsvector search backed by the GIN expression index offer_search_idx on
+    coder_offer, built over the same expression as vector().
+
+    The query is parsed with websearch_to_tsquery (quotes, `or`, `-term`)
+    and ranked with ts_rank.
+    """
+    config = 'english'
+
+    def vector(self):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector('title', 'description', config=self.config)
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        search_query = SearchQuery(query, config=self.config, search_type='websearch')
+        # Filtering on the same expression as the index lets PostgreSQL use it
+        return queryset.alias(search_vector=self.vector()) \
+            .filter(search_vector=search_query) \
+            .annotate(search_rank=SearchRank(self.vector(), search_query))
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    """Return the search backend for the database alias."""
+    if settings.OFFER_SEARCH_BACKEND:
+        backend_class = import_string(settings.OFFER_SEARCH_BACKEND)
+    else:
+        backend_class = VENDOR_BACKENDS.get(connections[using].vendor, LikeSearchBackend)
+    return backend_class(using)
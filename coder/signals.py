@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from auth_app.models import User
+from coder.api.cache import response_cache
+from coder.images import needs_renditions, schedule_renditions
+from coder.models import Offer, OfferDetail, PlatformStats, Profile, Review
+from coder.search import get_search_backend
+
+
+def _is_business(profile):
+    try:
+        return profile.user.type == 'business'
+    except Profile.user.RelatedObjectDoesNotExist:
+        return False
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, using, **kwargs):
+    """Store the rating currently in the database so post_save can apply the difference."""
+    if instance.pk is None:
+        instance._previous_rating = None
+    else:
+        reviews = Review.objects.using(using).filter(pk=instance.pk)
+        if transaction.get_connection(using).in_atomic_block:
+            # Lock the row so concurrent updates apply their differences one after another
+            reviews = reviews.select_for_update()
+        instance._previous_rating = reviews.values_list('rating', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    previous_rating = getattr(instance, '_previous_rating', None)
+    if created or previous_rating is None:
+        PlatformStats.increment(review_count=1, rating_sum=instance.rating)
+        Profile.update_review_stats(instance.business_user_id, added=instance.rating)
+    elif previous_rating != instance.rating:
+        PlatformStats.increment(rating_sum=instance.rating - previous_rating)
+        Profile.update_review_stats(instance.business_user_id, added=instance.rating, removed=previous_rating)
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    PlatformStats.increment(review_count=-1, rating_sum=-instance.rating)
+    Profile.update_review_stats(instance.business_user_id, removed=instance.rating)
+
+
+@receiver(post_save, sender=Offer)
+def count_created_offer(sender, instance, created, **kwargs):
+    if created:
+        PlatformStats.increment(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    PlatformStats.increment(offer_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+def index_saved_offer(sender, instance, created, update_fields, using, **kwargs):
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    get_search_backend(using).index([instance])
+
+
+@receiver(post_delete, sender=Offer)
+def unindex_deleted_offer(sender, instance, using, **kwargs):
+    get_search_backend(using).remove([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+def count_created_profile(sender, instance, created, **kwargs):
+    if created and _is_business(instance):
+        PlatformStats.increment(business_profile_count=1)
+
+
+@receiver(post_delete, sender=Profile)
+def count_deleted_profile(sender, instance, **kwargs):
+    if _is_business(instance):
+        PlatformStats.increment(business_profile_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+def evict_saved_offer(sender, instance, created, **kwargs):
+    if created:
+        # A new offer can appear on any page
+        response_cache.invalidate('offers')
+    else:
+        response_cache.invalidate(f'offer:{instance.pk}', 'offer-facets')
+
+
+@receiver(post_delete, sender=Offer)
+def evict_deleted_offer(sender, instance, **kwargs):
+    response_cache.invalidate('offers')
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def evict_offer_of_detail(sender, instance, **kwargs):
+    response_cache.invalidate(f'offer:{instance.offer_id}', 'offer-facets')
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_profile_offers(sender, instance, **kwargs):
+    response_cache.invalidate(f'creator:{instance.user_id}')
+
+
+@receiver(post_save, sender=User)
+def evict_user_offers(sender, instance, created, **kwargs):
+    if not created:
+        response_cache.invalidate(f'creator:{instance.pk}')
+
+
+@receiver(post_save, sender=Offer)
+def render_offer_image(sender, instance, **kwargs):
+    if needs_renditions(instance, 'image', 'image_renditions'):
+        schedule_renditions(instance, 'image', 'image_renditions')
+
+
+@receiver(post_save, sender=Profile)
+def render_profile_picture(sender, instance, **kwargs):
+    if needs_renditions(instance, 'file', 'file_renditions'):
+        schedule_renditions(instance, 'file', 'file_renditions')
@@ -1,3 +1,581 @@
-from django.test import TestCase
+import json
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
+
+from auth_app.models import User
+from coder.api.serializers import OfferListSerializer, OrderSerializer, ReviewSerializer
+from coder.api.streaming import StreamRateThrottle
+from coder.api.views import OfferView
+from coder.models import Offer, OfferDetail, Order, PlatformStats, Profile, Review
+from core.database import current_read_alias, replica_aliases
+
+
+def create_user(username, type='customer'):
+    user = User.objects.create_user(username, password='pw12345!x', type=type, first_name=username)
+    Profile.objects.create(user=user)
+    return user
+
+
+class OfferTestMixin:
+    """A business user that creates offers through the API."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.business = create_user('business', type='business')
+
+    def create_offer(self, title='Website', description='A new website', prices=(100, 200, 300)):
+        details = [
+            {
+                'title': f'{title} {offer_type}',
+                'revisions': index + 1,
+                'delivery_time_in_days': (index + 1) * 3,
+                'price': price,
+                'features': ['Design'],
+                'offer_type': offer_type,
+            }
+            for index, (offer_type, price) in enumerate(zip(('basic', 'standard', 'premium'), prices))
+        ]
+        self.client.force_authenticate(self.business)
+        response = self.client.post('/api/offers/', {
+            'title': title,
+            'description': description,
+            'details': details,
+        }, format='json')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data
+
+
+class OfferTestCase(OfferTestMixin, APITestCase):
+    pass
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Reads SQLite query plans.')
+class IndexUsageTests(TestCase):
+    """
+    EXPLAIN QUERY PLAN the hot filter and ordering queries and fail if one
+    of them reads a whole table instead of seeking through an index.
+    """
+
+    def plan(self, queryset):
+        return queryset.explain().splitlines()
+
+    def assertUsesIndex(self, queryset):
+        for line in self.plan(queryset):
+            # SQLite reports full table scans as a bare "SCAN <table>"
+            self.assertNotRegex(line, r'\bSCAN \w+$', f'Full table scan in {queryset.query}')
+
+    def assertOrderedByIndex(self, queryset):
+        self.assertUsesIndex(queryset)
+        for line in self.plan(queryset):
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', line, f'Sorts the whole table in {queryset.query}')
+
+    def test_filters_use_indexes(self):
+        querysets = {
+            'orders by business user and status': Order.objects.filter(business_user_id=1, status='in_progress'),
+            'review of a business by a reviewer': Review.objects.filter(reviewer_id=1, business_user_id=2),
+            'users by type': User.objects.filter(type='business'),
+            'business profiles': Profile.objects.filter(user__type='business').order_by('uploaded_at', 'id')[:20],
+            'platform stats': PlatformStats.objects.filter(pk=1),
+        }
+        for name, queryset in querysets.items():
+            with self.subTest(name):
+                self.assertUsesIndex(queryset)
+
+    def test_list_orderings_use_indexes(self):
+        querysets = {
+            'offers by updated_at': Offer.objects.order_by('updated_at', 'id')[:6],
+            'reviews by updated_at': Review.objects.order_by('updated_at', 'id')[:20],
+            'reviews by rating': Review.objects.order_by('-rating', '-id')[:20],
+            'orders by created_at': Order.objects.order_by('created_at', 'id')[:20],
+            'profiles by average rating': Profile.objects.order_by('-average_rating', '-id')[:20],
+        }
+        for name, queryset in querysets.items():
+            with self.subTest(name):
+                self.assertOrderedByIndex(queryset)
+
+
+# Counts the queries on the primary; tests always have a replica alias
+@mock.patch('coder.api.replicas.replica_aliases', new=list)
+@override_settings(OFFER_LIST_CACHE=None)
+class OfferListQueryTests(OfferTestCase):
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for index in range(6):
+            self.create_offer(title=f'Offer {index}')
+
+        for page_size in (3, 100):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                # Count, offers with profile and user, detail ids
+                response = self.client.get(f'/api/offers/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), min(page_size, 6))
+
+
+class OrderListTests(OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.customer = create_user('customer')
+        self.other_customer = create_user('other_customer')
+        self.other_business = create_user('other_business', type='business')
+
+    def create_order(self, customer, offer_detail):
+        self.client.force_authenticate(customer)
+        response = self.client.post('/api/orders/', {'offer_detail_id': offer_detail.pk}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data['id']
+
+    def list_orders(self, user):
+        self.client.force_authenticate(user)
+        # One keyset page over the UNION of the caller's orders
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/orders/?page_size=100')
+        self.assertEqual(response.status_code, 200)
+        return sorted(order['id'] for order in response.data['results'])
+
+    def test_lists_only_own_orders_in_one_query(self):
+        self.create_offer()
+        own_detail = OfferDetail.objects.filter(offer__profile__user=self.business).first()
+        other_offer = Offer.objects.create(
+            profile=Profile.objects.get(user=self.other_business), title='Logo', description='A logo'
+        )
+        other_detail = OfferDetail.objects.create(
+            offer=other_offer, title='Logo basic', revisions=1, delivery_time_in_days=2,
+            price=50, features=['Logo'], offer_type='basic',
+        )
+
+        customer_orders = [self.create_order(self.customer, own_detail) for _ in range(3)]
+        customer_orders.append(self.create_order(self.customer, other_detail))
+        other_orders = [self.create_order(self.other_customer, own_detail) for _ in range(5)]
+
+        self.assertEqual(self.list_orders(self.customer), sorted(customer_orders))
+        self.assertEqual(self.list_orders(self.other_customer), sorted(other_orders))
+        self.assertEqual(self.list_orders(self.business), sorted(customer_orders[:3] + other_orders))
+        self.assertEqual(self.list_orders(self.other_business), customer_orders[3:])
+
+
+class OfferUpdateTests(OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.offer = self.create_offer()
+
+    def patch(self, data):
+        self.client.force_authenticate(self.business)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/offers/{self.offer["id"]}/', data, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ]
+
+    def test_patching_three_details_takes_two_writes(self):
+        writes = self.patch({'details': [
+            {'offer_type': 'basic', 'price': 150},
+            {'offer_type': 'standard', 'price': 250, 'revisions': 5},
+            {'offer_type': 'premium', 'price': 350, 'features': ['Design', 'Hosting']},
+        ]})
+
+        # One bulk UPDATE of the details, one UPDATE of the offer's min_price
+        self.assertEqual(len(writes), 2, writes)
+        self.assertTrue(writes[0].startswith('UPDATE "coder_offerdetail"'))
+        self.assertTrue(writes[1].startswith('UPDATE "coder_offer"'))
+        self.assertEqual(Offer.objects.get(pk=self.offer['id']).min_price, 150)
+        self.assertEqual(
+            sorted(OfferDetail.objects.filter(offer_id=self.offer['id']).values_list('price', flat=True)),
+            [150, 250, 350],
+        )
+
+    def test_details_without_min_value_changes_skip_the_offer(self):
+        writes = self.patch({'details': [{'offer_type': 'premium', 'revisions': 10}]})
+
+        self.assertEqual(len(writes), 1, writes)
+        self.assertTrue(writes[0].startswith('UPDATE "coder_offerdetail"'))
+
+    def test_unchanged_values_write_nothing(self):
+        writes = self.patch({'title': self.offer['title'], 'details': [{'offer_type': 'basic', 'price': 100}]})
+
+        self.assertEqual(writes, [])
+
+
+class OfferConditionalTests(OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.offer = self.create_offer()
+        self.url = f'/api/offers/{self.offer["id"]}/'
+        self.client.force_authenticate(self.business)
+
+    def test_unchanged_offer_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_details_only_patch_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        data = {'details': [{'offer_type': 'premium', 'revisions': 10}]}
+
+        response = self.client.patch(self.url, data, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # A second client still holding the old ETag must not overwrite the change
+        data = {'details': [{'offer_type': 'premium', 'revisions': 3}]}
+        response = self.client.patch(self.url, data, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(OfferDetail.objects.get(offer_id=self.offer['id'], offer_type='premium').revisions, 10)
+
+
+class OfferImportTests(OfferTestCase):
+
+    def detail_rows(self):
+        return [
+            {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': 5, 'price': price,
+             'features': ['Design'], 'offer_type': offer_type}
+            for offer_type, price in (('basic', 100), ('standard', 200), ('premium', 300))
+        ]
+
+    def invalid_detail_rows(self):
+        rows = self.detail_rows()
+        rows[0]['price'] = 'cheap'
+        return rows
+
+    def csv_file(self, *rows):
+        lines = ['title,description,details']
+        for title, details in rows:
+            details = json.dumps(details).replace('"', '""')
+            lines.append(f'{title},An offer,"{details}"')
+        return SimpleUploadedFile('offers.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+    def upload(self, upload, user=None):
+        self.client.force_authenticate(user or self.business)
+        return self.client.post('/api/offers/import/', {'file': upload}, format='multipart')
+
+    def test_valid_csv_creates_offers(self):
+        response = self.upload(self.csv_file(('Logo', self.detail_rows()), ('Website', self.detail_rows())))
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data, {'created': 2, 'error_count': 0, 'errors': []})
+        offers = Offer.objects.filter(profile__user=self.business)
+        self.assertEqual(sorted(offers.values_list('title', flat=True)), ['Logo', 'Website'])
+        self.assertEqual(sorted(offers.values_list('min_price', flat=True)), [100, 100])
+        self.assertEqual(OfferDetail.objects.filter(offer__in=offers).count(), 6)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        response = self.upload(self.csv_file(('Logo', self.detail_rows()), ('Website', self.invalid_detail_rows())))
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        self.assertIn('details', response.data['errors'][0]['errors'])
+
+    def test_only_invalid_rows_is_a_bad_request(self):
+        response = self.upload(self.csv_file(('Website', self.invalid_detail_rows())))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['error_count'], 1)
+
+    def test_empty_file_is_a_field_error(self):
+        for content in (b'', b'title,description,details\n'):
+            with self.subTest(content=content):
+                response = self.upload(SimpleUploadedFile('offers.csv', content, content_type='text/csv'))
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('file', response.data)
+
+    def test_customers_cannot_import(self):
+        customer = create_user('customer')
+
+        response = self.upload(self.csv_file(('Logo', self.detail_rows())), user=customer)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Offer.objects.exists())
+
+
+class FastParityMixin:
+    """Compare FastReader output with the serializer it was compiled from."""
+
+    def assertFastParity(self, serializer_class, queryset):
+        request = Request(APIRequestFactory().get('/api/'))
+        context = {'request': request}
+        reader = serializer_class.get_fast_reader()
+        renderer = JSONRenderer()
+
+        fast = reader.render(queryset.values(*reader.lookups), context)
+        regular = serializer_class(queryset, many=True, context=context).data
+
+        self.assertGreater(len(regular), 1)
+        self.assertEqual(renderer.render(fast), renderer.render(regular))
+
+
+class FastReaderParityTests(FastParityMixin, OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.customer = create_user('customer')
+        first = self.create_offer(title='Logo')
+        self.create_offer(title='Website', prices=(99.5, 250, 1000))
+        Offer.objects.filter(pk=first['id']).update(
+            image='offers/logo.png',
+            image_renditions={'source': 'offers/logo.png', 'thumb': 'offers/renditions/logo-thumb.webp'},
+        )
+        Offer.objects.create(profile=Profile.objects.get(user=self.business), title='Draft', description='')
+
+    def test_offer_list(self):
+        queryset = Offer.objects.select_related('profile__user').prefetch_related('details').order_by('id')
+
+        self.assertFastParity(OfferListSerializer, queryset)
+
+    def test_order_list(self):
+        for detail in OfferDetail.objects.all():
+            Order.objects.create(
+                offer_detail=detail,
+                customer_user=Profile.objects.get(user=self.customer),
+                business_user=Profile.objects.get(user=self.business),
+                **Order.snapshot(detail),
+            )
+
+        self.assertFastParity(OrderSerializer, Order.objects.order_by('id'))
+
+    def test_review_list(self):
+        business = Profile.objects.get(user=self.business)
+        for index, reviewer in enumerate([self.customer, create_user('second_customer')]):
+            Review.objects.create(
+                business_user=business, reviewer=Profile.objects.get(user=reviewer),
+                rating=index + 4, description=f'Review {index}',
+            )
+
+        self.assertFastParity(ReviewSerializer, Review.objects.order_by('id'))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver', 'a.example', 'b.example'])
+class OfferListCacheTests(OfferTestCase):
+
+    def test_entries_are_per_host(self):
+        self.create_offer()
+        self.client.get('/api/offers/', HTTP_HOST='a.example')
+
+        response = self.client.get('/api/offers/', HTTP_HOST='b.example')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_repeated_request_is_a_hit(self):
+        self.create_offer()
+        self.client.get('/api/offers/?page_size=5', HTTP_HOST='a.example')
+
+        response = self.client.get('/api/offers/?page_size=5', HTTP_HOST='a.example')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_hits_include_facets_without_queries(self):
+        self.create_offer()
+        first = self.client.get('/api/offers/?facets=1')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/offers/?facets=1')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['facets'], first.data['facets'])
+
+    def test_offer_edit_evicts_faceted_pages(self):
+        offer = self.create_offer(prices=(100, 200, 300))
+        self.client.get('/api/offers/?facets=1')
+        self.client.force_authenticate(self.business)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f'/api/offers/{offer["id"]}/', {'details': [{'offer_type': 'basic', 'price': 20}]}, format='json'
+            )
+        self.client.force_authenticate(None)
+
+        response = self.client.get('/api/offers/?facets=1')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['facets']['price'][0], {'min': 0, 'max': 50, 'count': 1})
+
+
+class OfferStreamingTests(OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.create_offer()
+
+    def stream(self):
+        return self.client.get('/api/offers/?stream=1')
+
+    def test_authenticated_users_can_stream(self):
+        self.client.force_authenticate(create_user('customer'))
+
+        response = self.stream()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 1)
+
+    def test_anonymous_users_cannot_stream(self):
+        response = self.stream()
+
+        self.assertEqual(response.status_code, 401)
+
+    @mock.patch.object(StreamRateThrottle, 'THROTTLE_RATES', {'stream': '2/min'})
+    def test_streams_are_throttled(self):
+        self.client.force_authenticate(create_user('customer'))
+
+        statuses = [self.stream().status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+class KeysetWalkMixin:
+    """Follow next/previous links and compare against the expected ordering."""
+
+    def walk(self, url, direction='next'):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            page = [offer['id'] for offer in response.data['results']]
+            ids = ids + page if direction == 'next' else page + ids
+            url = response.data[direction]
+        return ids
+
+    def expected(self, *ordering):
+        return list(Offer.objects.order_by(*ordering).values_list('id', flat=True))
+
+
+class OfferKeysetPaginationTests(KeysetWalkMixin, OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for prices in ((300, 400, 500), (100, 200, 300), (100, 150, 200)):
+            self.create_offer(prices=prices)
+        # Offers without details have no min_price
+        profile = Profile.objects.get(user=self.business)
+        for index in range(2):
+            Offer.objects.create(profile=profile, title=f'Draft {index}', description='Draft')
+
+    def test_nullable_ordering_sorts_nulls_last(self):
+        ids = self.walk('/api/offers/?cursor=&ordering=min_price&page_size=2')
+
+        self.assertEqual(ids, self.expected(F('min_price').asc(nulls_last=True), 'id'))
+        self.assertEqual(Offer.objects.get(pk=ids[-1]).min_price, None)
+
+    def test_nullable_ordering_descending_sorts_nulls_first(self):
+        ids = self.walk('/api/offers/?cursor=&ordering=-min_price&page_size=2')
+
+        self.assertEqual(ids, self.expected(F('min_price').desc(nulls_first=True), '-id'))
+        self.assertEqual(Offer.objects.get(pk=ids[0]).min_price, None)
+
+    def test_previous_links_walk_back_over_nulls(self):
+        url = '/api/offers/?cursor=&ordering=min_price&page_size=2'
+        while True:
+            response = self.client.get(url)
+            if not response.data['next']:
+                break
+            url = response.data['next']
+
+        ids = self.walk(response.data['previous'], direction='previous')
+
+        self.assertEqual(ids, self.expected(F('min_price').asc(nulls_last=True), 'id')[:-1])
+
+
+class OfferSearchTests(KeysetWalkMixin, OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_offer(title='Logo', description='Logo design with logo variants and a logo guide')
+        self.create_offer(title='Logo', description='Logo design')
+        self.create_offer(title='Website', description='Website with a logo')
+        self.create_offer(title='Logo', description='Logo design with logo variants')
+
+    def test_cursor_pages_keep_relevance_order(self):
+        relevance = [offer['id'] for offer in self.client.get('/api/offers/?search=logo&page_size=100').data['results']]
+
+        ids = self.walk('/api/offers/?search=logo&cursor=&page_size=1')
+
+        self.assertEqual(len(relevance), 4)
+        self.assertEqual(ids, relevance)
+
+    def test_cursor_pages_backwards(self):
+        relevance = [offer['id'] for offer in self.client.get('/api/offers/?search=logo&page_size=100').data['results']]
+        response = self.client.get('/api/offers/?search=logo&cursor=&page_size=3')
+
+        ids = self.walk(self.client.get(response.data['next']).data['previous'], direction='previous')
+
+        self.assertEqual(ids, relevance[:3])
+
+    def test_explicit_ordering_wins_over_relevance(self):
+        ids = self.walk('/api/offers/?search=logo&ordering=-updated_at&cursor=&page_size=2')
+
+        self.assertEqual(ids, self.expected('-updated_at', '-id'))
+
+
+class OfferReplicaReadTests(OfferTestMixin, APITransactionTestCase):
+    """
+    The replicas mirror the test database (see core.database), so these
+    tests check where queries run rather than what a lagging replica
+    would return.
+    """
+    databases = {'default', *replica_aliases()}
+
+    def setUp(self):
+        super().setUp()
+        caches[settings.REPLICA_PIN_CACHE].clear()
+        self.create_offer()
+        caches[settings.REPLICA_PIN_CACHE].clear()
+
+    def get_offers(self, user=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[replica_aliases()[0]]) as replica:
+            response = self.client.get('/api/offers/')
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_anonymous_cache_miss_reads_from_primary(self):
+        primary, replica = self.get_offers()
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    @override_settings(OFFER_LIST_CACHE=None)
+    def test_anonymous_reads_use_replica_without_cache(self):
+        primary, replica = self.get_offers()
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_authenticated_reads_use_replica(self):
+        customer = create_user('customer')
+
+        primary, replica = self.get_offers(customer)
+
+        self.assertGreater(replica, 0)
+
+    def test_writer_reads_from_primary(self):
+        self.create_offer()
+
+        primary, replica = self.get_offers(self.business)
+
+        self.assertEqual(replica, 0)
+
+    def test_read_alias_is_reset_after_uncaught_exceptions(self):
+        with mock.patch.object(OfferView, 'list', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError), override_settings(OFFER_LIST_CACHE=None):
+            self.client.get('/api/offers/')
+
+        self.assertIsNone(current_read_alias.get())
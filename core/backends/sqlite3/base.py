@@ -0,0 +1,98 @@
+"""
+SQLite backend tuned for concurrent use on a single node.
+
+Use it with ENGINE 'core.backends.sqlite3' (or DB_SQLITE_TUNED=1, see
+core/database.py). On every new connection it sets:
+
+    journal_mode  WAL: readers no longer wait for writers
+    synchronous   NORMAL: safe with WAL, no fsync per commit
+    mmap_size     bytes of the file read through memory mapping
+    cache_size    page cache size (negative values are KiB)
+    busy_timeout  milliseconds to wait for a lock before failing
+
+Transactions start with BEGIN IMMEDIATE and, within a process, one at a
+time per database file: a transaction first takes a per-file lock, waiting
+up to busy_timeout for it. Writers queue up in order instead of failing
+with "database is locked" when a read transaction tries to upgrade to a
+write. Writes in autocommit mode rely on busy_timeout alone.
+
+All settings can be changed in OPTIONS, e.g. {'mmap_size': 0}; set
+'serialize_writes' to False to skip the per-file lock.
+"""
+import threading
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+
+TUNING_DEFAULTS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+
+def _write_lock(name):
+    with _write_locks_guard:
+        return _write_locks.setdefault(str(name), threading.Lock())
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # The remaining OPTIONS are passed to sqlite3.connect(); take ours out
+        self.tuning = {name: kwargs.pop(name, default) for name, default in TUNING_DEFAULTS.items()}
+        self.serialize_writes = kwargs.pop('serialize_writes', True)
+        if self.transaction_mode is None:
+            self.transaction_mode = 'IMMEDIATE'
+
+        self.write_lock = _write_lock(kwargs['database'])
+        self.holds_write_lock = False
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        # busy_timeout first, switching to WAL needs a lock itself
+        for name in ('busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size'):
+            conn.execute(f'PRAGMA {name} = {self.tuning[name]}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.serialize_writes:
+            if not self.write_lock.acquire(timeout=self.tuning['busy_timeout'] / 1000):
+                raise OperationalError('database is locked')
+            self.holds_write_lock = True
+        try:
+            super()._start_transaction_under_autocommit()
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_lock()
+
+    def _release_write_lock(self):
+        if getattr(self, 'holds_write_lock', False):
+            self.holds_write_lock = False
+            self.write_lock.release()
@@ -0,0 +1,152 @@
+"""
+Environment driven database configuration and read replica routing.
+
+Without any DB_* environment variables the project runs on the local
+db.sqlite3 file. In production the primary and its replicas are described
+by environment variables:
+
+    DB_ENGINE             sqlite (default) or postgresql
+    DB_NAME               database name (SQLite: file path)
+    DB_USER, DB_PASSWORD
+    DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE       seconds to keep a connection open (default 60, SQLite 0)
+    DB_CONN_HEALTH_CHECKS check persistent connections before reuse (default on)
+    DB_POOL               use a psycopg connection pool instead of persistent
+                          connections (PostgreSQL only)
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+    DB_SQLITE_TUNED       use core.backends.sqlite3 (WAL, mmap, busy timeout,
+                          serialized writes) for SQLite
+    DB_REPLICAS           comma separated replica hosts (`host` or `host:port`;
+                          SQLite: file paths), configured as `replica_1`, ...
+
+Replicas are only read from by views using
+coder.api.replicas.ReplicaReadMixin, and only for GET/HEAD. After a
+client's successful write, its reads stay on the primary for
+REPLICA_PIN_SECONDS so it always sees its own changes.
+
+The test runner always gets at least one replica: without DB_REPLICAS,
+`replica_1` is a mirror of the test database, so the replica routing is
+exercised by every test run.
+"""
+import copy
+import os
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+# Alias reads of the current request go to; None means the primary
+current_read_alias = ContextVar('current_read_alias', default=None)
+
+
+def _flag(environ, name, default):
+    value = environ.get(name)
+    return default if value is None else value.strip().lower() in _TRUE
+
+
+def databases_from_env(base_dir, environ=os.environ, testing=False):
+    """
+    Return the DATABASES setting described by the DB_* environment variables.
+
+    With `testing`, a replica of the primary is added if none is configured.
+    """
+    engine = environ.get('DB_ENGINE', 'sqlite').strip().lower()
+    if engine in ('postgres', 'postgresql'):
+        primary = _postgresql(environ, environ.get('DB_HOST', 'localhost'), environ.get('DB_PORT', '5432'))
+        replicas = [_postgresql(environ, *_host_port(host)) for host in _split(environ.get('DB_REPLICAS'))]
+    elif engine in ('sqlite', 'sqlite3'):
+        primary = _sqlite(environ, environ.get('DB_NAME') or base_dir / 'db.sqlite3')
+        replicas = [_sqlite(environ, name) for name in _split(environ.get('DB_REPLICAS'))]
+    else:
+        raise ValueError(f'Unsupported DB_ENGINE {engine!r}; use sqlite or postgresql.')
+    if testing and not replicas:
+        replicas = [copy.deepcopy(primary)]
+
+    databases = {'default': primary}
+    for index, replica in enumerate(replicas, start=1):
+        # Tests run replica queries against the test copy of the primary
+        replica['TEST'] = {'MIRROR': 'default'}
+        databases[f'replica_{index}'] = replica
+    return databases
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def _host_port(value):
+    host, _, port = value.partition(':')
+    return host, port or '5432'
+
+
+def _sqlite(environ, name):
+    tuned = _flag(environ, 'DB_SQLITE_TUNED', False)
+    return {
+        'ENGINE': 'core.backends.sqlite3' if tuned else 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': int(environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': _flag(environ, 'DB_CONN_HEALTH_CHECKS', True),
+    }
+
+
+def _postgresql(environ, host, port):
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('DB_NAME', 'coder'),
+        'USER': environ.get('DB_USER', ''),
+        'PASSWORD': environ.get('DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': int(environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': _flag(environ, 'DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {},
+    }
+    if _flag(environ, 'DB_POOL', False):
+        # The pool replaces persistent connections; Django rejects both at once
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != 'default']
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request, writes and
+    migrations to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def _pin_key(user_id):
+    return f'db-primary-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Keep the user's reads on the primary for REPLICA_PIN_SECONDS."""
+    caches[settings.REPLICA_PIN_CACHE].set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return caches[settings.REPLICA_PIN_CACHE].get(_pin_key(user_id)) is not None
@@ -0,0 +1,223 @@
+"""
+In-process request metrics.
+
+RequestMetricsMiddleware (core.middleware) records, per request, the number
+of SQL queries, the time spent in the database, the time spent serializing
+and the total time, tagged by URL name. The values are aggregated into the
+histograms below and exposed in Prometheus text format by MetricsView, to
+staff users and to scrapers that send `Authorization: Bearer <METRICS_TOKEN>`.
+Nothing is recorded while REQUEST_METRICS_ENABLED is off.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.permissions import BasePermission
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+current_request_metrics = ContextVar('current_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Measurements collected while a single request is handled.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.total_time = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper that counts and times every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.query_count += 1
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Return the value for the Server-Timing response header."""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+@contextmanager
+def serialize_timer():
+    """
+    Add the time spent in the block to the current request's serializer time.
+    Does nothing when request metrics are disabled.
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - started
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with one series per label value.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            counts, total = self._series.get(label, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[label] = (counts, total + value)
+
+    def expose(self):
+        """Render the histogram in the Prometheus text exposition format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = sorted((label, list(counts), total) for label, (counts, total) in self._series.items())
+
+        for label, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {cumulative}')
+        return lines
+
+
+class Counter:
+    """
+    Thread-safe monotonic counter with one series per label value.
+    """
+
+    def __init__(self, name, documentation, label_name):
+        self.name = name
+        self.documentation = documentation
+        self.label_name = label_name
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label, amount=1):
+        """Add to the label's value; does nothing when request metrics are disabled."""
+        if not settings.REQUEST_METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def get(self, label):
+        with self._lock:
+            return self._values.get(label, 0)
+
+    def expose(self):
+        """Render the counter in the Prometheus text exposition format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label, value in values:
+            lines.append(f'{self.name}{{{self.label_name}="{label}"}} {value}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Total time spent handling the request.', SECONDS_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent executing SQL queries.', SECONDS_BUCKETS)
+REQUEST_SERIALIZE_DURATION = Histogram(
+    'http_request_serialize_duration_seconds', 'Time spent serializing and rendering the response.', SECONDS_BUCKETS)
+REQUEST_QUERY_COUNT = Histogram(
+    'http_request_db_queries', 'Number of SQL queries per request.', QUERY_COUNT_BUCKETS)
+
+HISTOGRAMS = [REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_SERIALIZE_DURATION, REQUEST_QUERY_COUNT]
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    'response_cache_lookups_total', 'Response cache lookups by result (hit/miss).', 'result')
+
+COUNTERS = [RESPONSE_CACHE_LOOKUPS]
+
+
+def record(view_name, metrics):
+    """Add the measurements of one request to the histograms."""
+    REQUEST_DURATION.observe(view_name, metrics.total_time)
+    REQUEST_DB_DURATION.observe(view_name, metrics.db_time)
+    REQUEST_SERIALIZE_DURATION.observe(view_name, metrics.serialize_time)
+    REQUEST_QUERY_COUNT.observe(view_name, metrics.query_count)
+
+
+METRICS_TOKEN_AUTH = 'metrics-token'
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Accept `Authorization: Bearer <METRICS_TOKEN>` from metrics scrapers.
+
+    Other headers are left to the next authentication class.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        if token and constant_time_compare(get_authorization_header(request), f'Bearer {token}'.encode()):
+            return AnonymousUser(), METRICS_TOKEN_AUTH
+        return None
+
+
+class CanReadMetrics(BasePermission):
+    """Staff users and requests authenticated with the metrics token."""
+
+    def has_permission(self, request, view):
+        return request.auth == METRICS_TOKEN_AUTH or bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """
+    Expose the request histograms and counters in Prometheus text format.
+
+    Only available when REQUEST_METRICS_ENABLED is set; returns 404 otherwise.
+    Readable by staff users and with the METRICS_TOKEN (see CanReadMetrics).
+    """
+    permission_classes = [CanReadMetrics]
+    authentication_classes = [MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    def get(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise Http404
+
+        lines = []
+        for metric in HISTOGRAMS + COUNTERS:
+            lines.extend(metric.expose())
+        return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4')
@@ -0,0 +1,82 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from core import metrics
+from core.database import pin_to_primary, replica_aliases
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, serializer time and total time per request.
+
+    Enabled with the REQUEST_METRICS_ENABLED setting. The measurements are
+    sent back in a Server-Timing header and aggregated per URL name into the
+    histograms served at /api/metrics/. For streaming responses only the
+    time until the response starts is measured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request_metrics.set(request_metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(request_metrics.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            metrics.current_request_metrics.reset(token)
+
+        request_metrics.finish()
+        response['Server-Timing'] = request_metrics.server_timing()
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.url_name if match and match.url_name else 'unmatched'
+        metrics.record(view_name, request_metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that too
+        render = response.render
+
+        def timed_render():
+            with metrics.serialize_timer():
+                return render()
+
+        response.render = timed_render
+        return response
+
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pin users to the primary database after a successful write.
+
+    Every POST/PUT/PATCH/DELETE answered with a status below 400 keeps the
+    user's reads on the primary for REPLICA_PIN_SECONDS (see
+    coder.api.replicas.ReplicaReadMixin), so a client reading right after a
+    write sees it even if the replicas lag behind. Not used without
+    replicas.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF sets the authenticated user on the underlying request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.id)
+        return response
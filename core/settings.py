@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
+from core.database import databases_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -78,12 +83,19 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Configured from DB_* environment variables (see core/database.py); the
+# local db.sqlite3 without them. Replicas are added as replica_1, replica_2, ...
+# Test runs always get a replica alias that mirrors the test database.
+TESTING = sys.argv[1:2] == ['test']
+DATABASES = databases_from_env(BASE_DIR, testing=TESTING)
+
+DATABASE_ROUTERS = ['core.database.ReplicaRouter']
+
+# After a successful write, a user's reads stay on the primary for this
+# many seconds. The pins live in this cache alias; use a shared backend
+# when running several processes.
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_CACHE = 'default'
 
 
 # Password validation
@@ -133,11 +145,69 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'auth_app.authentication.SignedTokenAuthentication',
+        'auth_app.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
-   
-}
\ No newline at end of file
+    'DEFAULT_PAGINATION_CLASS': 'coder.api.pagination.KeysetPagination',
+    # Streamed lists (?stream=1) per user, see coder.api.streaming
+    'DEFAULT_THROTTLE_RATES': {'stream': '60/hour'},
+}
+
+
+# Seconds clients and proxies may cache the /api/base-info/ response
+BASE_INFO_CACHE_MAX_AGE = 60
+
+# Per-request query count / timing metrics (Server-Timing header and /api/metrics/)
+REQUEST_METRICS_ENABLED = False
+# Bearer token for scraping /api/metrics/ without a staff account (None = staff only)
+METRICS_TOKEN = None
+
+# Token authentication cache: in-process LRU size, entry lifetime in seconds
+# and an optional shared cache alias (from CACHES) as second tier
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 60
+TOKEN_AUTH_SHARED_CACHE = None
+
+# Signed access / refresh token lifetimes in seconds. While
+# LEGACY_AUTH_TOKENS is set, login and registration also return the old
+# DRF token so existing clients keep working.
+ACCESS_TOKEN_LIFETIME = 15 * 60
+REFRESH_TOKEN_LIFETIME = 14 * 24 * 60 * 60
+LEGACY_AUTH_TOKENS = True
+
+# Password hashing for registration/login runs in a process pool of this
+# size (0 = thread executor); at most MAX_PENDING hashes may be queued
+# before requests are rejected with 503
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_MAX_PENDING = 32
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# Cache alias and entry lifetime (seconds) for anonymous offer list
+# responses (see coder/api/cache.py); None disables the cache
+OFFER_LIST_CACHE = 'responses'
+OFFER_LIST_CACHE_TTL = 60
+
+# Dotted path to the offer full-text search backend (see coder/search.py);
+# None picks FTS5 on SQLite and tsvector/GIN on PostgreSQL
+OFFER_SEARCH_BACKEND = None
+
+# Resized WebP renditions of offer images and profile pictures (see
+# coder/images.py): label -> max width in pixels, WebP quality and the
+# number of background threads (0 = create them inline after commit)
+IMAGE_RENDITIONS = {'thumb': 160, 'small': 480, 'large': 1280}
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITION_WORKERS = 2
@@ -0,0 +1,65 @@
+from django.test import TestCase, override_settings
+
+from auth_app.models import User
+from auth_app.tokens import issue_token_pair
+from coder.api.cache import response_cache
+from core.metrics import RESPONSE_CACHE_LOOKUPS
+
+
+class MetricsTestMixin:
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='pw12345!x', type='customer', is_staff=True)
+        self.customer = User.objects.create_user('customer', password='pw12345!x', type='customer')
+
+    def get_metrics(self, user=None, **headers):
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {issue_token_pair(user)["access"]}'
+        return self.client.get('/api/metrics/', **headers)
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, METRICS_TOKEN='scrape-secret')
+class MetricsEnabledTests(MetricsTestMixin, TestCase):
+
+    def test_staff_and_token_can_read(self):
+        for user, headers in ((self.staff, {}), (None, {'HTTP_AUTHORIZATION': 'Bearer scrape-secret'})):
+            with self.subTest(user=user):
+                response = self.get_metrics(user, **headers)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b'# TYPE http_request_duration_seconds histogram', response.content)
+
+    def test_others_cannot_read(self):
+        for user, headers in (
+            (None, {}),
+            (self.customer, {}),
+            (None, {'HTTP_AUTHORIZATION': 'Bearer wrong-secret'}),
+        ):
+            with self.subTest(user=user, headers=headers):
+                response = self.get_metrics(user, **headers)
+
+                self.assertIn(response.status_code, (401, 403))
+
+    def test_cache_lookups_are_counted(self):
+        misses = RESPONSE_CACHE_LOOKUPS.get('miss')
+
+        response_cache.get('missing')
+
+        self.assertEqual(RESPONSE_CACHE_LOOKUPS.get('miss'), misses + 1)
+
+
+@override_settings(REQUEST_METRICS_ENABLED=False, METRICS_TOKEN='scrape-secret')
+class MetricsDisabledTests(MetricsTestMixin, TestCase):
+
+    def test_endpoint_is_not_found(self):
+        response = self.get_metrics(self.staff)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_cache_lookups_are_not_counted(self):
+        misses = RESPONSE_CACHE_LOOKUPS.get('miss')
+
+        response_cache.get('missing')
+
+        self.assertEqual(RESPONSE_CACHE_LOOKUPS.get('miss'), misses)
@@ -16,9 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from core.metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('api/', include('coder.api.urls')),
     path('api/', include('auth_app.api.urls')),
     path('api/', include('profile_app.api.urls')),
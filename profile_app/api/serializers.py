@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from coder.models import Profile
+from coder.api.fast import FastReadSerializerMixin
+from coder.api.fields import RenditionsField
 
 
 
@@ -13,10 +15,11 @@ class CustomerProfileSerializer(serializers.ModelSerializer):
     type = serializers.SerializerMethodField()
     email = serializers.EmailField(source='user.email')
     created_at = serializers.DateTimeField(source='user.date_joined', read_only=True)
+    file_renditions = RenditionsField(image_field='file')
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'uploaded_at', 'type', 'email', 'created_at']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_renditions', 'uploaded_at', 'type', 'email', 'created_at']
 
     def get_user(self, obj):
         return obj.user.id
@@ -58,16 +61,22 @@ class CustomerProfileSerializer(serializers.ModelSerializer):
 class BusinessProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for customer profiles, including linked user fields.
+
+    The review aggregates (review_count, rating_sum, average_rating and
+    rating_histogram, the number of reviews per rating) are read-only.
     """
     user = serializers.SerializerMethodField()
     username = serializers.SerializerMethodField()
     type = serializers.SerializerMethodField()
     email = serializers.EmailField(source='user.email')
     created_at = serializers.DateTimeField(source='user.date_joined', read_only=True)
+    file_renditions = RenditionsField(image_field='file')
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', 'description', 'working_hours', 'type', 'email', 'created_at']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_renditions', 'location', 'tel', 'description', 'working_hours', 'type', 'email', 'created_at', 'review_count', 'rating_sum', 'average_rating', 'rating_histogram']
+        read_only_fields = ['review_count', 'rating_sum', 'average_rating']
 
     def get_user(self, obj):
         return obj.user.id
@@ -106,17 +115,24 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
 
     
 
-class CustomerProfileListSerializer(serializers.ModelSerializer):
+class CustomerProfileListSerializer(FastReadSerializerMixin, serializers.ModelSerializer):
     """
     Compact serializer for listing customer profiles.
     """
+    fast_sources = {
+        'user': 'user_id',
+        'username': 'user__username',
+        'type': 'user__type',
+    }
+
     user = serializers.SerializerMethodField()
     username = serializers.SerializerMethodField()
     type = serializers.SerializerMethodField()
+    file_renditions = RenditionsField(image_field='file')
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'uploaded_at', 'type']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_renditions', 'uploaded_at', 'type']
 
     def get_user(self, obj): return obj.user.id
     def get_username(self, obj): return obj.user.username
@@ -128,6 +144,13 @@ class CustomerProfileListSerializer(serializers.ModelSerializer):
             data['file'] = ''
         return data
 
+    @classmethod
+    def fast_finalize(cls, data, rows, context):
+        for item in data:
+            if item.get('file') is None:
+                item['file'] = ''
+        return data
+
     
 
 
@@ -135,8 +158,16 @@ class CustomerProfileListSerializer(serializers.ModelSerializer):
 
 class BusinessProfileListSerializer(CustomerProfileListSerializer):
     """
-    Compact serializer for listing business profiles with extended fields.
+    Compact serializer for listing business profiles with extended fields
+    and review aggregates.
     """
+    fast_sources = {
+        **CustomerProfileListSerializer.fast_sources,
+        'rating_histogram': {str(rating): f'rating_{rating}_count' for rating in Profile.RATING_VALUES},
+    }
+
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', 'description', 'working_hours', 'type']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_renditions', 'location', 'tel', 'description', 'working_hours', 'type', 'review_count', 'rating_sum', 'average_rating', 'rating_histogram']
@@ -1,12 +1,15 @@
 from rest_framework import generics,viewsets,filters,status
 from .serializers import CustomerProfileSerializer, BusinessProfileSerializer,CustomerProfileListSerializer,BusinessProfileListSerializer
 from coder.models import Profile
+from coder.api.conditional import ConditionalRequestMixin
+from coder.api.fast import FastListMixin
+from coder.api.replicas import ReplicaReadMixin
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 
 
-class ProfileDetailView(generics.GenericAPIView):
+class ProfileDetailView(ConditionalRequestMixin, generics.GenericAPIView):
     """
     Retrieve or partially update a user profile.
 
@@ -16,9 +19,19 @@ class ProfileDetailView(generics.GenericAPIView):
     Behavior:
         GET: Returns the profile data. Uses different serializers for business and customer users.
         PATCH: Allows the owner of the profile to partially update it.
+
+    Conditional requests:
+        ETag / Last-Modified from updated_at and the shown user fields;
+        304 for unchanged GETs, 412 for PATCH with a stale If-Match.
     """
     queryset = Profile.objects.all()
     permission_classes = [IsAuthenticated]
+    version_fields = ('updated_at', 'user__email', 'user__username', 'user__type')
+    conditional_owner_lookup = 'user_id'
+
+    def get_etag_variant(self):
+        # The serializer depends on the type of the requesting user
+        return self.request.user.type
     
     def get_serializer_class(self):
         if self.request.user.type == 'business':
@@ -46,25 +59,39 @@ class ProfileDetailView(generics.GenericAPIView):
         return Response(input_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProfileCustomerView(generics.ListAPIView):
+class ProfileCustomerView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     """
     List all customer profiles.
 
     Permissions:
         Only authenticated users.
+
+    Pagination:
+        Keyset pagination ordered by (uploaded_at, id).
     """
     queryset = Profile.objects.filter(user__type='customer')
+    ordering = ['uploaded_at']
     serializer_class = CustomerProfileListSerializer
     permission_classes = [IsAuthenticated]
 
 
-class ProfileBusinessView(generics.ListAPIView):
+class ProfileBusinessView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     """
     List all business profiles.
 
     Permissions:
         Only authenticated users.
+
+    Ordering:
+        Can order by 'uploaded_at', 'review_count' or 'average_rating'.
+
+    Pagination:
+        Keyset pagination over the chosen ordering plus id, by default
+        (uploaded_at, id).
     """
     queryset = Profile.objects.filter(user__type='business')
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['uploaded_at', 'review_count', 'average_rating']
+    ordering = ['uploaded_at']
     serializer_class = BusinessProfileListSerializer
     permission_classes = [IsAuthenticated]
@@ -1,3 +1,34 @@
 from django.test import TestCase
 
-# Create your tests here.
+from coder.models import Profile
+from coder.tests import FastParityMixin, create_user
+from profile_app.api.serializers import BusinessProfileListSerializer, CustomerProfileListSerializer
+
+
+class FastReaderParityTests(FastParityMixin, TestCase):
+
+    def setUp(self):
+        for name in ('anna', 'ben'):
+            create_user(name)
+            create_user(f'{name}_business', type='business')
+
+        Profile.objects.filter(user__username__startswith='anna').update(
+            file='profile_pics/anna.png',
+            file_renditions={'source': 'profile_pics/anna.png', 'thumb': 'profile_pics/renditions/anna-thumb.webp'},
+            location='Berlin',
+            review_count=2,
+            rating_sum=9,
+            average_rating=4.5,
+            rating_4_count=1,
+            rating_5_count=1,
+        )
+
+    def test_customer_list(self):
+        queryset = Profile.objects.filter(user__type='customer').select_related('user').order_by('id')
+
+        self.assertFastParity(CustomerProfileListSerializer, queryset)
+
+    def test_business_list(self):
+        queryset = Profile.objects.filter(user__type='business').select_related('user').order_by('id')
+
+        self.assertFastParity(BusinessProfileListSerializer, queryset)